@@ -4,6 +4,69 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+VARIABLES = ['temperature', 'wind_speed', 'wind_direction', 'precipitation']
+
+# Two-sided 95% z-score, scipy.stats.norm.ppf(0.975)
+Z_95 = 1.959963984540054
+
+def _group_stats(codes, values, ngroups):
+    """
+    Calculate mean, std, min, max and median of values for each group code.
+    
+    Values are sorted once by (group, value) so min, max and median are read
+    straight from each group's contiguous slice. NaNs are ignored, matching pandas.
+    """
+    valid = (codes >= 0) & ~np.isnan(values)
+    codes = codes[valid]
+    values = values[valid]
+    
+    sorted_values = values[np.lexsort((values, codes))]
+    counts = np.bincount(codes, minlength=ngroups)
+    starts = np.cumsum(counts) - counts
+    present = counts > 0
+    
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.bincount(codes, weights=values, minlength=ngroups) / counts
+        squares = np.bincount(codes, weights=(values - mean[codes]) ** 2, minlength=ngroups)
+        std = np.sqrt(squares / (counts - 1))
+    std[counts < 2] = np.nan
+    
+    minimum = np.full(ngroups, np.nan)
+    maximum = np.full(ngroups, np.nan)
+    median = np.full(ngroups, np.nan)
+    starts, counts = starts[present], counts[present]
+    minimum[present] = sorted_values[starts]
+    maximum[present] = sorted_values[starts + counts - 1]
+    median[present] = (sorted_values[starts + (counts - 1) // 2] + sorted_values[starts + counts // 2]) / 2
+    
+    return {'mean': mean, 'std': std, 'min': minimum, 'max': maximum, 'median': median}
+
+def _pair_means(outer_codes, inner_codes, n_inner, values):
+    """
+    Calculate the mean of each row of values for every observed (outer, inner) code pair.
+    
+    Rows are sorted once by the combined key and each run of equal keys is summed
+    with np.add.reduceat. NaNs are ignored, matching pandas.
+    
+    Returns:
+        tuple: (outer codes, inner codes, means with one column per pair)
+    """
+    keep = (outer_codes >= 0) & (inner_codes >= 0)
+    keys = outer_codes[keep] * n_inner + inner_codes[keep]
+    order = np.argsort(keys, kind='stable')
+    keys = keys[order]
+    values = values[:, keep][:, order]
+    
+    starts = np.flatnonzero(np.diff(keys, prepend=-1))
+    valid = ~np.isnan(values)
+    sums = np.add.reduceat(np.where(valid, values, 0.0), starts, axis=1)
+    counts = np.add.reduceat(valid, starts, axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = sums / counts
+    
+    pair_keys = keys[starts]
+    return pair_keys // n_inner, pair_keys % n_inner, means
+
 def analyze_ensemble_data(ensemble_data):
     """
     Analyze ensemble forecast data and calculate statistics.
@@ -20,46 +83,58 @@ def analyze_ensemble_data(ensemble_data):
             return {}
             
         logger.info(f"Analyzing ensemble data with shape: {ensemble_data.shape}")
-        logger.info(f"Columns in ensemble data: {ensemble_data.columns.tolist()}")
-        logger.info(f"Number of unique models: {ensemble_data['model'].nunique()}")
-        logger.info(f"Models present: {ensemble_data['model'].unique().tolist()}")
-        logger.info(f"Forecast hours range: {ensemble_data['forecast_hour'].min()} to {ensemble_data['forecast_hour'].max()}")
+        # Diagnostics scan every row, so only compute them when they will be emitted
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Columns in ensemble data: {ensemble_data.columns.tolist()}")
+            logger.debug(f"Models present: {ensemble_data['model'].unique().tolist()}")
+            logger.debug(f"Forecast hours range: {ensemble_data['forecast_hour'].min()} to {ensemble_data['forecast_hour'].max()}")
+            summary = ensemble_data[VARIABLES].agg(['count', 'min', 'max'])
+            for variable in VARIABLES:
+                logger.debug(
+                    f"{variable}: {int(summary.at['count', variable])} non-null values, "
+                    f"range {summary.at['min', variable]} to {summary.at['max', variable]}"
+                )
         
         # Group by forecast hour and calculate statistics
         analysis = {}
         
-        for variable in ['temperature', 'wind_speed', 'wind_direction', 'precipitation']:
-            logger.info(f"Processing variable: {variable}")
-            logger.info(f"Non-null values for {variable}: {ensemble_data[variable].count()}")
-            logger.info(f"Value range for {variable}: {ensemble_data[variable].min()} to {ensemble_data[variable].max()}")
-            
-            stats = ensemble_data.groupby('forecast_hour')[variable].agg([
-                'mean',
-                'std',
-                'min',
-                'max',
-                'median'
-            ]).reset_index()
-            
-            logger.info(f"Stats shape for {variable}: {stats.shape}")
-            logger.info(f"Stats columns: {stats.columns.tolist()}")
+        # Factorize once with sorted codes so the plots draw forecast hours in order
+        codes, forecast_hours = pd.factorize(ensemble_data['forecast_hour'], sort=True)
+        # Materialize all variable columns in one pass; rows of the transpose are contiguous
+        values = ensemble_data[VARIABLES].to_numpy(dtype=np.float64).T
+        
+        stats_by_variable = [
+            _group_stats(codes, variable_values, len(forecast_hours)) for variable_values in values
+        ]
+        
+        # Calculate confidence intervals for all variables in one broadcast
+        means = np.stack([stats['mean'] for stats in stats_by_variable])
+        stds = np.stack([stats['std'] for stats in stats_by_variable])
+        ci_lower = means - Z_95 * stds
+        ci_upper = means + Z_95 * stds
+        
+        for i, variable in enumerate(VARIABLES):
+            stats = pd.DataFrame({
+                'forecast_hour': np.asarray(forecast_hours),
+                **stats_by_variable[i],
+                'ci_lower': ci_lower[i],
+                'ci_upper': ci_upper[i]
+            })
             
-            # Calculate confidence intervals
-            stats['ci_lower'] = stats['mean'] - 1.96 * stats['std']
-            stats['ci_upper'] = stats['mean'] + 1.96 * stats['std']
+            logger.debug(f"Stats shape for {variable}: {stats.shape}")
             
             analysis[variable] = stats
             
         # Calculate model agreement
-        model_agreement = ensemble_data.groupby(['forecast_hour', 'model']).agg({
-            'temperature': 'mean',
-            'wind_speed': 'mean',
-            'wind_direction': 'mean',
-            'precipitation': 'mean'
-        }).reset_index()
+        model_codes, models = pd.factorize(ensemble_data['model'], sort=True)
+        hour_index, model_index, model_means = _pair_means(codes, model_codes, len(models), values)
+        model_agreement = pd.DataFrame({
+            'forecast_hour': np.asarray(forecast_hours)[hour_index],
+            'model': models.take(model_index),
+            **dict(zip(VARIABLES, model_means))
+        })
         
-        logger.info(f"Model agreement shape: {model_agreement.shape}")
-        logger.info(f"Model agreement columns: {model_agreement.columns.tolist()}")
+        logger.debug(f"Model agreement shape: {model_agreement.shape}")
         
         analysis['model_agreement'] = model_agreement
         
@@ -1,24 +1,64 @@
 import os
+import atexit
 import requests
-from datetime import datetime, timedelta
+from requests.adapters import HTTPAdapter
+from datetime import datetime, timedelta, timezone
 import bz2
+import email.utils
+import json
 import re
-from bs4 import BeautifulSoup
+from urllib.parse import urlencode, urlparse
 import logging
+import logging.handlers
+import queue
+import random
 import time
 import concurrent.futures
+import functools
+import itertools
+import threading
 from typing import List, Dict, Any, Optional, Tuple
 from tqdm import tqdm
 import dateutil.parser
 
-# Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S'
-)
 logger = logging.getLogger(__name__)
 
+# Shared HTTP session so every request to a host reuses a kept-alive connection
+# instead of paying a new TCP + TLS handshake. The pool blocks when all of a host's
+# connections are busy, so bursts (e.g. concurrent run probes for several NOMADS
+# models) wait for a warm connection instead of opening throwaway ones.
+# The adapter makes a single attempt: download_with_retry owns retries and backoff,
+# so transport retries would only multiply its attempts, and throttle responses
+# (429/503) reach it directly, where the wait is capped and the whole host backs off.
+SESSION = requests.Session()
+_adapter = HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=16,
+    pool_block=True,
+    max_retries=0
+)
+SESSION.mount("http://", _adapter)
+SESSION.mount("https://", _adapter)
+SESSION.headers.update({"User-Agent": "wx-grib-comparison"})
+atexit.register(SESSION.close)
+
+# Directory listings are only searched for link targets, so match them directly
+# instead of building an HTML parse tree. Relative entries only: Apache's column
+# sort links (?C=N;O=D) and absolute parent links (/...) are never wanted.
+LINK_RE = re.compile(r'href="([^"?/][^"]*)"')
+# Every .grib2 file linked from a listing
+GRIB2_LINK_RE = re.compile(r'href="([^"?/][^"]*\.grib2)"')
+# Run timestamp (YYYYMMDDHH) of every ICON single-level file linked from a listing
+ICON_FILE_RE = re.compile(r'href="icon_global_icosahedral_single-level_(\d{10})_\d{3}_\w+\.grib2\.bz2"')
+
+# Every GRIB message starts with this indicator and ends with this marker
+GRIB_MAGIC = b"GRIB"
+GRIB_END = b"7777"
+
+# Size of the reads used to stream response bodies; large enough that the
+# per-chunk Python overhead is negligible even for multi-megabyte GRIBs
+DOWNLOAD_CHUNK_SIZE = 1 << 20
+
 # Model resolution configurations
 MODEL_RESOLUTIONS = {
     'gfs': {
@@ -72,6 +112,120 @@ MODEL_RESOLUTIONS = {
     }
 }
 
+# How long a discovered latest run is reused before probing the servers again
+RUN_CACHE_SECONDS = 900
+
+# Variables every model download knows how to request
+SUPPORTED_VARIABLES = {"u10", "v10", "t2m", "prate"}
+
+# NOMADS filter CGI parameter that selects each of our variables
+NOMADS_VAR_PARAMS = {
+    "u10": "var_UGRD",
+    "v10": "var_VGRD",
+    "t2m": "var_TMP",
+    "prate": "var_PRATE"
+}
+
+# Discovered runs are also persisted, so invocations within the same interval
+# skip discovery entirely
+RUN_CACHE_PATH = os.path.join("gribs", ".run_cache.json")
+_run_cache_lock = threading.Lock()
+
+def _encode_run(run) -> Dict[str, Any]:
+    """Convert a discovered run (a datetime, or ICON's dict) to JSON-compatible form."""
+    if isinstance(run, datetime):
+        return {"run_time": run.isoformat()}
+    return {**run, "timestamp": run["timestamp"].isoformat()}
+
+def _decode_run(entry: Dict[str, Any]):
+    """Inverse of _encode_run."""
+    if "run_time" in entry:
+        return dateutil.parser.isoparse(entry["run_time"])
+    return {**entry, "timestamp": dateutil.parser.isoparse(entry["timestamp"])}
+
+def _read_run_cache() -> Dict[str, Any]:
+    """Read the persisted run cache. Must be called with the lock held."""
+    try:
+        with open(RUN_CACHE_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _load_cached_run(name: str, interval: Optional[int]):
+    """Get the run persisted for name in this interval (None for no expiry), or None."""
+    with _run_cache_lock:
+        entry = _read_run_cache().get(name)
+    if entry is None or entry.get("interval") != interval:
+        return None
+    try:
+        return _decode_run(entry["run"])
+    except (KeyError, TypeError, ValueError) as e:
+        logger.debug("Ignoring unreadable cached run for %s: %s", name, e)
+        return None
+
+def _store_cached_run(name: str, interval: Optional[int], run) -> None:
+    """Persist the run discovered for name in this interval (None for no expiry)."""
+    with _run_cache_lock:
+        cache = _read_run_cache()
+        cache[name] = {"interval": interval, "run": _encode_run(run)}
+        try:
+            os.makedirs(os.path.dirname(RUN_CACHE_PATH), exist_ok=True)
+            tmp_path = RUN_CACHE_PATH + ".part"
+            with open(tmp_path, "w") as f:
+                json.dump(cache, f)
+            os.replace(tmp_path, RUN_CACHE_PATH)
+        except OSError as e:
+            logger.warning("Could not save run cache: %s", e)
+
+def _cache_per_interval(seconds: int):
+    """
+    Memoize a zero-argument function for fixed wall-clock intervals.
+    
+    The result is cached with functools.lru_cache keyed on the current interval
+    number, so repeated calls within the same interval skip the work entirely.
+    Found runs are also persisted to RUN_CACHE_PATH, so later invocations of the
+    script within the same interval reuse them too.
+    """
+    def decorator(func):
+        @functools.lru_cache(maxsize=1)
+        def cached(interval):
+            run = _load_cached_run(func.__name__, interval)
+            if run is None:
+                run = func()
+                if run is not None:
+                    _store_cached_run(func.__name__, interval, run)
+            return run
+        
+        @functools.wraps(func)
+        def wrapper():
+            return cached(int(time.time()) // seconds)
+        
+        wrapper.cache_clear = cached.cache_clear
+        return wrapper
+    return decorator
+
+def _validate_request(lat_min, lat_max, lon_min, lon_max, variables, hours) -> None:
+    """
+    Reject requests that could only produce failed downloads before any HTTP is sent.
+    
+    Raises:
+        ValueError: If the bounding box is inverted, hours is negative or a variable is unsupported
+    """
+    if not (lat_min < lat_max and lon_min < lon_max):
+        raise ValueError(f"Invalid bounding box: lat {lat_min}..{lat_max}, lon {lon_min}..{lon_max}")
+    if hours < 0:
+        raise ValueError(f"Invalid forecast hours: {hours}")
+    unsupported = set(variables) - SUPPORTED_VARIABLES
+    if unsupported:
+        raise ValueError(f"Unsupported variables: {sorted(unsupported)}")
+
+def _filter_var_flags(variables: List[str]) -> Dict[str, str]:
+    """
+    Build the NOMADS filter on/off flag for every variable parameter.
+    """
+    wanted = set(variables)
+    return {param: "on" if var in wanted else "off" for var, param in NOMADS_VAR_PARAMS.items()}
+
 def get_current_run_time():
     """Get the current time rounded down to the nearest model run hour"""
     now = datetime.utcnow()
@@ -79,353 +233,513 @@ def get_current_run_time():
     hour = (now.hour // 6) * 6
     return now.replace(hour=hour, minute=0, second=0, microsecond=0)
 
-def get_latest_gfs_run():
-    """Find the latest available GFS run"""
-    base_url = "https://nomads.ncep.noaa.gov/pub/data/nccf/com/gfs/prod"
-    current_run = get_current_run_time()
+def _run_candidates(start: datetime, days: int, hours: List[int]) -> List[datetime]:
+    """
+    List candidate run times, newest first, for the given days back and run hours.
+    Runs that would start in the future are skipped.
+    """
+    now = datetime.utcnow()
+    candidates = []
+    for days_back in range(days):
+        date = start - timedelta(days=days_back)
+        for hour in hours:
+            run_time = date.replace(hour=hour, minute=0, second=0, microsecond=0)
+            if run_time <= now:
+                candidates.append(run_time)
+    return candidates
+
+def _file_exists(url: str) -> bool:
+    """Check whether a remote file exists with a HEAD request, transferring no body."""
+    r = SESSION.head(url, timeout=10, allow_redirects=True)
+    if r.status_code != 200:
+        logger.debug("%s not found (status %s)", url, r.status_code)
+    return r.status_code == 200
+
+# Validators and body of every directory listing fetched, keyed by URL, so an
+# unchanged listing is revalidated with a conditional GET instead of re-sent.
+# The cache is persisted so reruns within the same model cycle benefit too.
+LISTING_CACHE_PATH = os.path.join("gribs", ".listing_cache.json")
+_listing_cache: Optional[Dict[str, Tuple[Optional[str], Optional[str], str]]] = None
+_listing_cache_lock = threading.Lock()
+
+def _load_listing_cache() -> Dict[str, Tuple[Optional[str], Optional[str], str]]:
+    """Load the persisted listing cache on first use. Must be called with the lock held."""
+    global _listing_cache
+    if _listing_cache is None:
+        try:
+            with open(LISTING_CACHE_PATH) as f:
+                _listing_cache = {url: tuple(entry) for url, entry in json.load(f).items()}
+        except (OSError, ValueError) as e:
+            logger.debug("Starting with an empty listing cache: %s", e)
+            _listing_cache = {}
+    return _listing_cache
+
+def _save_listing_cache() -> None:
+    """Persist the listing cache atomically. Must be called with the lock held."""
+    try:
+        os.makedirs(os.path.dirname(LISTING_CACHE_PATH), exist_ok=True)
+        tmp_path = LISTING_CACHE_PATH + ".part"
+        with open(tmp_path, "w") as f:
+            json.dump(_listing_cache, f)
+        os.replace(tmp_path, LISTING_CACHE_PATH)
+    except OSError as e:
+        logger.warning("Could not save listing cache: %s", e)
+
+def _get_listing(url: str) -> Optional[str]:
+    """
+    Fetch the HTML of a directory listing, reusing the cached copy if the server reports it unchanged.
     
-    # Try the last 3 days
-    for days_back in range(3):
-        date = current_run - timedelta(days=days_back)
-        date_str = date.strftime("%Y%m%d")
-        
-        # Try each run hour (00, 06, 12, 18)
-        for hour in [18, 12, 6, 0]:
-            run_str = f"{hour:02d}"
-            url = f"{base_url}/gfs.{date_str}/{run_str}/atmos"
+    Returns:
+        The listing HTML, or None if the server did not return it
+    """
+    with _listing_cache_lock:
+        cached = _load_listing_cache().get(url)
+    headers = {}
+    if cached is not None:
+        etag, last_modified, _ = cached
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+    
+    r = SESSION.get(url, headers=headers, timeout=10)
+    if r.status_code == 304 and cached is not None:
+        logger.debug("Listing %s not modified, using cached copy", url)
+        return cached[2]
+    if r.status_code != 200:
+        logger.debug("Listing %s not available (status %s)", url, r.status_code)
+        return None
+    
+    etag = r.headers.get('ETag')
+    last_modified = r.headers.get('Last-Modified')
+    if etag or last_modified:
+        with _listing_cache_lock:
+            _load_listing_cache()[url] = (etag, last_modified, r.text)
+            _save_listing_cache()
+    return r.text
+
+def _find_latest_run(model: str, candidates: List[datetime], probe, max_workers: int = 8) -> Optional[datetime]:
+    """
+    Probe candidate runs concurrently and return the newest available one.
+    
+    Args:
+        model: Model name used in log messages
+        candidates: Candidate run times ordered newest first
+        probe: Callable taking a run time and returning True if that run is available
+        max_workers: Maximum number of concurrent probes
+    """
+    # Runs are not withdrawn once published, so the run found by an earlier
+    # invocation is a floor: only newer candidates need a request
+    cache_name = f"{model} latest"
+    previous = _load_cached_run(cache_name, None)
+    if previous is not None and candidates and previous >= candidates[-1]:
+        candidates = [run_time for run_time in candidates if run_time > previous]
+    else:
+        previous = None
+    
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+    futures = [executor.submit(probe, run_time) for run_time in candidates]
+    try:
+        # Resolve in priority order; once the newest available run is confirmed
+        # the remaining probes are no longer needed
+        for run_time, future in zip(candidates, futures):
             try:
-                r = requests.get(url, timeout=10)
-                if r.status_code == 200:
-                    # Check if the run files exist
-                    test_file = f"gfs.t{run_str}z.pgrb2.0p25.f000"
-                    if test_file in r.text:
-                        run_time = date.replace(hour=hour, minute=0, second=0, microsecond=0)
-                        logger.info(f"Found GFS run from {date_str} {run_str}Z")
-                        return run_time
-                    else:
-                        logger.debug(f"GFS run {date_str} {run_str}Z exists but test file not found")
-                else:
-                    logger.debug(f"GFS run {date_str} {run_str}Z not found (status {r.status_code})")
+                available = future.result()
             except Exception as e:
-                logger.error(f"Error checking GFS run {date_str} {run_str}Z: {str(e)}")
-    logger.warning("No available GFS runs found in the last 3 days")
+                logger.error("Error checking %s run %sZ: %s", model, run_time.strftime('%Y%m%d %H'), e)
+                available = False
+            if available:
+                logger.info("Found %s run from %sZ", model, run_time.strftime('%Y%m%d %H'))
+                _store_cached_run(cache_name, None, run_time)
+                return run_time
+    finally:
+        # Return without waiting for probes of older runs that are still in flight
+        for pending in futures:
+            pending.cancel()
+        executor.shutdown(wait=False)
+    if previous is not None:
+        logger.info("No %s run newer than %sZ, reusing it", model, previous.strftime('%Y%m%d %H'))
+        return previous
+    logger.warning("No available %s runs found", model)
     return None
 
+@_cache_per_interval(RUN_CACHE_SECONDS)
+def get_latest_gfs_run():
+    """Find the latest available GFS run"""
+    base_url = "https://nomads.ncep.noaa.gov/pub/data/nccf/com/gfs/prod"
+    candidates = _run_candidates(get_current_run_time(), days=3, hours=[18, 12, 6, 0])
+    return _find_latest_run("GFS", candidates, lambda run: _file_exists(
+        f"{base_url}/gfs.{run:%Y%m%d}/{run:%H}/atmos/gfs.t{run:%H}z.pgrb2.0p25.f000"
+    ))
+
+def _scan_icon_hour_dir(base_url: str, hour: str, var_dir: str) -> Optional[Dict[str, Any]]:
+    """Find the newest ICON run listed in one variable subdirectory of an hour directory."""
+    var_url = f"{base_url}/{hour}/{var_dir}/"
+    logger.debug("Checking variable directory URL: %s", var_url)
+    try:
+        listing = _get_listing(var_url)
+    except requests.RequestException as e:
+        logger.debug("Error accessing variable directory %s: %s", var_url, e)
+        return None
+    if listing is None:
+        return None
+    
+    # Collect the distinct run timestamps first; YYYYMMDDHH strings sort
+    # chronologically, so only the newest one needs to be parsed
+    timestamps = set(ICON_FILE_RE.findall(listing))
+    logger.debug("Found %d runs in %s for %s", len(timestamps), var_dir, hour)
+    if not timestamps:
+        return None
+    timestamp_str = max(timestamps)
+    try:
+        timestamp = datetime.strptime(timestamp_str, '%Y%m%d%H')
+    except ValueError as e:
+        logger.debug("Error parsing timestamp %s in %s: %s", timestamp_str, var_url, e)
+        return None
+    return {
+        'hour': hour,
+        'timestamp': timestamp,
+        'url': var_url
+    }
+
+@_cache_per_interval(RUN_CACHE_SECONDS)
 def get_latest_icon_run():
-    """Find the latest available ICON run by checking variable subdirectories in each hour directory, searching up to 7 days back."""
+    """Find the latest available ICON run by checking a variable subdirectory in each hour directory."""
     base_url = "https://opendata.dwd.de/weather/nwp/icon/grib"
     hour_dirs = ["00", "06", "12", "18"]
-    var_map = {
-        "u10": "u_10m",
-        "v10": "v_10m",
-        "t2m": "t_2m",
-        "prate": "tot_prec"
-    }
+    # Every variable directory of an hour holds files from the same runs, so
+    # listing one of them is enough
+    probe_var_dir = "t_2m"
     
-    latest_run = None
-    latest_timestamp = None
-    now = datetime.utcnow()
-    # Search up to 7 days back
-    for days_back in range(7):
-        date = now - timedelta(days=days_back)
-        date_str = date.strftime("%Y%m%d")
-        for hour in hour_dirs:
-            hour_url = f"{base_url}/{hour}/"
-            logging.debug(f"Checking hour directory: {hour_url}")
-            try:
-                response = requests.get(hour_url)
-                response.raise_for_status()
-                logging.debug(f"HTTP status code for {hour_url}: {response.status_code}")
-                soup = BeautifulSoup(response.text, 'html.parser')
-                links = soup.find_all('a')
-                logging.debug(f"Found {len(links)} links in {hour} directory on {date_str}")
-                for link in links:
-                    href = link.get('href', '')
-                    if href.endswith('/'):
-                        href = href[:-1]
-                    logging.debug(f"Found link: {href}")
-                    if href in var_map.values():
-                        var_url = f"{hour_url}{href}/"
-                        logging.debug(f"Found variable directory: {href}")
-                        logging.debug(f"Checking variable directory URL: {var_url}")
-                        try:
-                            var_response = requests.get(var_url)
-                            var_response.raise_for_status()
-                            logging.debug(f"Variable directory status code: {var_response.status_code}")
-                            var_soup = BeautifulSoup(var_response.text, 'html.parser')
-                            var_links = var_soup.find_all('a')
-                            logging.debug(f"Found {len(var_links)} files in {href} for {date_str} {hour}")
-                            for var_link in var_links:
-                                var_href = var_link.get('href', '')
-                                if var_href.startswith('icon_global_icosahedral_single-level_') and var_href.endswith('.grib2.bz2'):
-                                    try:
-                                        parts = var_href.split('_')
-                                        if len(parts) >= 6:
-                                            timestamp_str = parts[4]  # This is the YYYYMMDDHH part
-                                            timestamp = datetime.strptime(timestamp_str, '%Y%m%d%H')
-                                            logging.debug(f"Found file: {var_href} with timestamp {timestamp_str}")
-                                            if latest_timestamp is None or timestamp > latest_timestamp:
-                                                latest_timestamp = timestamp
-                                                latest_run = {
-                                                    'hour': hour,
-                                                    'timestamp': timestamp,
-                                                    'url': var_url
-                                                }
-                                                logging.info(f"Found new latest run: {hour} at {timestamp}")
-                                    except (ValueError, IndexError) as e:
-                                        logging.debug(f"Error parsing timestamp from {var_href}: {e}")
-                                        continue
-                        except requests.RequestException as e:
-                            logging.debug(f"Error accessing variable directory {var_url}: {e}")
-                            continue
-            except requests.RequestException as e:
-                logging.debug(f"Error accessing hour directory {hour_url}: {e}")
-                continue
-    if latest_run:
-        logging.info(f"Found latest ICON run: {latest_run['hour']} at {latest_run['timestamp']}")
+    # The hour directories hold the files of their most recent runs, so each one
+    # only needs to be listed once; scan them concurrently
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(hour_dirs)) as executor:
+        runs = executor.map(lambda hour: _scan_icon_hour_dir(base_url, hour, probe_var_dir), hour_dirs)
+        runs = [run for run in runs if run is not None]
+    
+    if runs:
+        latest_run = max(runs, key=lambda run: run['timestamp'])
+        logger.info("Found latest ICON run: %s at %s", latest_run['hour'], latest_run['timestamp'])
         return latest_run
     else:
-        logging.warning("No available ICON runs found in the variable subdirectories.")
+        logger.warning("No available ICON runs found in the variable subdirectories.")
         return None
 
+@_cache_per_interval(RUN_CACHE_SECONDS)
 def get_latest_cmc_run():
     """Find the latest available CMC run"""
     base_url = "https://dd.weather.gc.ca/model_gem_global/15km/grib2"
-    current_run = get_current_run_time()
+    candidates = _run_candidates(get_current_run_time(), days=3, hours=[18, 12, 6, 0])
     
-    # Try the last 3 days
-    for days_back in range(3):
-        date = current_run - timedelta(days=days_back)
-        date_str = date.strftime("%Y%m%d")
-        
-        # Try each run hour (00, 06, 12, 18)
-        for hour in [18, 12, 6, 0]:
-            run_str = f"{hour:02d}"
-            
-            # Check the main run page first
-            try:
-                url = f"{base_url}/{hour:02d}"
-                r = requests.get(url, timeout=10)
-                if r.status_code == 200:
-                    # Check for any forecast file for this run
-                    soup = BeautifulSoup(r.text, 'html.parser')
-                    links = soup.find_all('a')
-                    
-                    # Look for .grib2 files
-                    for link in links:
-                        if link.get('href', '').endswith('.grib2') and date_str in link.get('href', ''):
-                            run_time = date.replace(hour=hour, minute=0, second=0, microsecond=0)
-                            logger.info(f"Found CMC run from {date_str} {run_str}Z")
-                            return run_time
-                    
-                    logger.debug(f"CMC run {date_str} {run_str}Z directory exists but no forecast files found")
-                else:
-                    logger.debug(f"CMC run hour {hour:02d} not found (status {r.status_code})")
-            except Exception as e:
-                logger.error(f"Error checking CMC run {date_str} {run_str}Z: {str(e)}")
+    # Every day's run of an hour is listed in the same hour directory, so fetch each
+    # of those listings once, concurrently, instead of once per candidate day
+    def fetch_listing(hour):
+        try:
+            return _get_listing(f"{base_url}/{hour:02d}")
+        except Exception as e:
+            logger.error("Error fetching CMC %02dZ listing: %s", hour, e)
+            return None
     
-    logger.warning("No available CMC runs found in the last 3 days")
-    return None
+    hours = sorted({run.hour for run in candidates})
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(len(hours), 1)) as executor:
+        listings = dict(zip(hours, executor.map(fetch_listing, hours)))
+    
+    def probe(run):
+        # Check the run hour page for any forecast file from this run's date
+        listing = listings[run.hour]
+        if listing is None:
+            return False
+        date_str = run.strftime("%Y%m%d")
+        # Stop at the first matching link instead of collecting the whole listing
+        if any(date_str in match.group(1) for match in GRIB2_LINK_RE.finditer(listing)):
+            return True
+        logger.debug("CMC run %s %02dZ directory exists but no forecast files found", date_str, run.hour)
+        return False
+    
+    return _find_latest_run("CMC", candidates, probe)
 
+@_cache_per_interval(RUN_CACHE_SECONDS)
 def get_latest_hrrr_run():
     """Find the latest available HRRR run"""
     base_url = "https://nomads.ncep.noaa.gov/pub/data/nccf/com/hrrr/prod"
-    current_run = get_current_run_time()
-    
     # Try the last 2 days (HRRR is more frequent)
-    for days_back in range(2):
-        date = current_run - timedelta(days=days_back)
-        date_str = date.strftime("%Y%m%d")
-        
-        # Try each run hour (23 to 0)
-        for hour in range(23, -1, -1):
-            run_str = f"{hour:02d}"
-            url = f"{base_url}/hrrr.{date_str}/conus"
-            try:
-                r = requests.get(url, timeout=10)
-                if r.status_code == 200:
-                    # Check if the run files exist
-                    test_file = f"hrrr.t{run_str}z.wrfsfcf00.grib2"
-                    if test_file in r.text:
-                        run_time = date.replace(hour=hour, minute=0, second=0, microsecond=0)
-                        logger.info(f"Found HRRR run from {date_str} {run_str}Z")
-                        return run_time
-                    else:
-                        logger.debug(f"HRRR run {date_str} {run_str}Z exists but test file not found")
-                else:
-                    logger.debug(f"HRRR run {date_str} {run_str}Z not found (status {r.status_code})")
-            except Exception as e:
-                logger.error(f"Error checking HRRR run {date_str} {run_str}Z: {str(e)}")
-    logger.warning("No available HRRR runs found in the last 2 days")
-    return None
+    candidates = _run_candidates(get_current_run_time(), days=2, hours=list(range(23, -1, -1)))
+    return _find_latest_run("HRRR", candidates, lambda run: _file_exists(
+        f"{base_url}/hrrr.{run:%Y%m%d}/conus/hrrr.t{run:%H}z.wrfsfcf00.grib2"
+    ))
 
+@_cache_per_interval(RUN_CACHE_SECONDS)
 def get_latest_nam_run():
     """Find the latest available NAM run"""
     base_url = "https://nomads.ncep.noaa.gov/pub/data/nccf/com/nam/prod"
-    now = datetime.utcnow()
-    
-    # Try the last 3 days
-    for days_back in range(3):
-        date = now - timedelta(days=days_back)
-        date_str = date.strftime("%Y%m%d")
-        
-        # Try each run hour (00, 06, 12, 18)
-        for hour in [18, 12, 6, 0]:
-            run_str = f"{hour:02d}"
-            url = f"{base_url}/nam.{date_str}"
-            try:
-                r = requests.get(url, timeout=10)
-                if r.status_code == 200:
-                    # Check if the run files exist
-                    test_file = f"nam.t{run_str}z.awphys000.tm00.grib2"
-                    if test_file in r.text:
-                        return date.replace(hour=hour, minute=0, second=0, microsecond=0)
-            except Exception as e:
-                print(f"Error checking NAM run: {str(e)}")
-    return None
+    candidates = _run_candidates(datetime.utcnow(), days=3, hours=[18, 12, 6, 0])
+    return _find_latest_run("NAM", candidates, lambda run: _file_exists(
+        f"{base_url}/nam.{run:%Y%m%d}/nam.t{run:%H}z.awphys000.tm00.grib2"
+    ))
 
+@_cache_per_interval(RUN_CACHE_SECONDS)
 def get_latest_rap_run():
     """Find the latest available RAP run"""
     base_url = "https://nomads.ncep.noaa.gov/pub/data/nccf/com/rap/prod"
-    now = datetime.utcnow()
-    
-    # Try the last 2 days (RAP is more frequent)
-    for days_back in range(2):
-        date = now - timedelta(days=days_back)
-        date_str = date.strftime("%Y%m%d")
-        
-        # Try each run hour (23 to 0)
-        for hour in range(23, -1, -1):
-            run_str = f"{hour:02d}"
-            url = f"{base_url}/rap.{date_str}"
-            try:
-                r = requests.get(url, timeout=10)
-                if r.status_code == 200:
-                    # Check if the run files exist
-                    test_file = f"rap.t{run_str}z.awp130pgrbf00.grib2"
-                    if test_file in r.text:
-                        return date.replace(hour=hour, minute=0, second=0, microsecond=0)
-            except Exception as e:
-                print(f"Error checking RAP run: {str(e)}")
-    return None
+    candidates = _run_candidates(datetime.utcnow(), days=2, hours=list(range(23, -1, -1)))
+    return _find_latest_run("RAP", candidates, lambda run: _file_exists(
+        f"{base_url}/rap.{run:%Y%m%d}/rap.t{run:%H}z.awp130pgrbf00.grib2"
+    ))
 
+@_cache_per_interval(RUN_CACHE_SECONDS)
 def get_latest_nbm_run():
     """Find the latest available NBM run"""
     base_url = "https://nomads.ncep.noaa.gov/pub/data/nccf/com/blend/prod"
-    now = datetime.utcnow()
-    
-    # Try the last 2 days
-    for days_back in range(2):
-        date = now - timedelta(days=days_back)
-        date_str = date.strftime("%Y%m%d")
-        
-        # Try each run hour (23 to 0)
-        for hour in range(23, -1, -1):
-            run_str = f"{hour:02d}"
-            url = f"{base_url}/blend.{date_str}"
-            try:
-                r = requests.get(url, timeout=10)
-                if r.status_code == 200:
-                    # Check if the run files exist
-                    test_file = f"blend.t{run_str}z.core.f000.co.grib2"
-                    if test_file in r.text:
-                        return date.replace(hour=hour, minute=0, second=0, microsecond=0)
-            except Exception as e:
-                print(f"Error checking NBM run: {str(e)}")
-    return None
+    candidates = _run_candidates(datetime.utcnow(), days=2, hours=list(range(23, -1, -1)))
+    return _find_latest_run("NBM", candidates, lambda run: _file_exists(
+        f"{base_url}/blend.{run:%Y%m%d}/blend.t{run:%H}z.core.f000.co.grib2"
+    ))
 
+@_cache_per_interval(RUN_CACHE_SECONDS)
 def get_latest_sref_run():
     """Find the latest available SREF run"""
     base_url = "https://nomads.ncep.noaa.gov/pub/data/nccf/com/sref/prod"
-    now = datetime.utcnow()
+    candidates = _run_candidates(datetime.utcnow(), days=3, hours=[18, 12, 6, 0])
+    return _find_latest_run("SREF", candidates, lambda run: _file_exists(
+        f"{base_url}/sref.{run:%Y%m%d}/sref.t{run:%H}z.pgrb132.f000.grib2"
+    ))
+
+def _write_grib_stream(chunks, out_path: str, url: str, not_grib_level: int = logging.ERROR) -> bool:
+    """
+    Write streamed GRIB data to out_path.
     
-    # Try the last 3 days
-    for days_back in range(3):
-        date = now - timedelta(days=days_back)
-        date_str = date.strftime("%Y%m%d")
-        
-        # Try each run hour (00, 06, 12, 18)
-        for hour in [18, 12, 6, 0]:
-            run_str = f"{hour:02d}"
-            url = f"{base_url}/sref.{date_str}"
+    The leading bytes are checked for the GRIB magic before the file is created, so
+    an HTML error page served with status 200 (as the NOMADS filter CGI does for bad
+    parameters) is never saved as a .grib2 file. Returns False if the check fails,
+    logging it at not_grib_level.
+    """
+    chunks = iter(chunks)
+    head = b""
+    for chunk in chunks:
+        head += chunk
+        if len(head) >= len(GRIB_MAGIC):
+            break
+    if not head.startswith(GRIB_MAGIC):
+        logger.log(not_grib_level, "Response is not GRIB data (starts with %r), skipping: %s", head[:16], url)
+        return False
+    # Write to a temporary name so an interrupted download never leaves a
+    # truncated file under the final name
+    part_path = out_path + ".part"
+    try:
+        with open(part_path, "wb") as f:
+            f.write(head)
+            for chunk in chunks:
+                f.write(chunk)
+        os.replace(part_path, out_path)
+    except BaseException:
+        # The stream failed midway (read timeout, truncated bz2, ...), so drop the partial file
+        try:
+            os.remove(part_path)
+        except OSError:
+            pass
+        raise
+    return True
+
+def _is_complete_grib(path: str) -> bool:
+    """Check whether a local file exists and is a GRIB file with its end marker intact."""
+    try:
+        if os.path.getsize(path) < len(GRIB_MAGIC) + len(GRIB_END):
+            return False
+        with open(path, "rb") as f:
+            head = f.read(len(GRIB_MAGIC))
+            f.seek(-len(GRIB_END), os.SEEK_END)
+            tail = f.read(len(GRIB_END))
+    except OSError:
+        return False
+    return head == GRIB_MAGIC and tail == GRIB_END
+
+# Upper bound on how long a server-sent Retry-After is honoured
+MAX_RETRY_AFTER = 120
+
+def _retry_delay(attempt: int, retry_after: Optional[str] = None) -> float:
+    """
+    Seconds to wait before the next attempt.
+    
+    Exponential backoff with random jitter, so workers that failed together do not
+    retry together, raised to the server's Retry-After (seconds or HTTP date) if given.
+    """
+    delay = 2 ** attempt + random.uniform(0, 1)
+    if retry_after:
+        try:
+            requested = float(retry_after)
+        except ValueError:
             try:
-                r = requests.get(url, timeout=10)
-                if r.status_code == 200:
-                    # Check if the run files exist
-                    test_file = f"sref.t{run_str}z.pgrb132.f000.grib2"
-                    if test_file in r.text:
-                        return date.replace(hour=hour, minute=0, second=0, microsecond=0)
-            except Exception as e:
-                print(f"Error checking SREF run: {str(e)}")
-    return None
+                requested = (email.utils.parsedate_to_datetime(retry_after) - datetime.now(timezone.utc)).total_seconds()
+            except (TypeError, ValueError):
+                requested = 0
+        delay = max(delay, min(requested, MAX_RETRY_AFTER))
+    return delay
 
 def download_with_retry(url: str, out_path: str, max_retries: int = 3, timeout: int = 30) -> bool:
     """
-    Download a file with retry logic and exponential backoff.
+    Download a file with retry logic and jittered exponential backoff.
     """
     for attempt in range(max_retries):
+        delay = None
         try:
-            r = requests.get(url, timeout=timeout)
-            if r.status_code == 200:
-                with open(out_path, "wb") as f:
-                    f.write(r.content)
-                return True
-            elif r.status_code == 429:
-                logger.error("Rate limit hit. Stopping retries.")
-                return False
-            else:
-                logger.warning(f"Attempt {attempt + 1}/{max_retries}: Failed to download (Status code: {r.status_code})")
+            with SESSION.get(url, timeout=(5, timeout), stream=True) as r:
+                if r.status_code == 200:
+                    return _write_grib_stream(r.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE), out_path, url)
+                elif r.status_code in THROTTLE_STATUS_CODES:
+                    # Back off for at least as long as the server asks, and let the
+                    # host's limiter shed concurrency instead of giving up
+                    delay = _retry_delay(attempt, r.headers.get("Retry-After"))
+                    _host_limiter(url).on_throttle(delay)
+                    logger.warning("Attempt %d/%d: Throttled by server (Status code: %s)", attempt + 1, max_retries, r.status_code)
+                else:
+                    logger.warning("Attempt %d/%d: Failed to download (Status code: %s)", attempt + 1, max_retries, r.status_code)
         except Exception as e:
-            logger.warning(f"Attempt {attempt + 1}/{max_retries}: Error downloading: {str(e)}")
+            logger.warning("Attempt %d/%d: Error downloading: %s", attempt + 1, max_retries, e)
         
         if attempt < max_retries - 1:
-            time.sleep(2 ** attempt)  # Exponential backoff
+            time.sleep(delay if delay is not None else _retry_delay(attempt))
     
-    logger.error(f"Failed to download after {max_retries} attempts: {url}")
+    logger.error("Failed to download after %d attempts: %s", max_retries, url)
     return False
 
+def _bz2_decompress_stream(chunks):
+    """
+    Decompress a stream of bz2 chunks incrementally.
+    
+    Raises EOFError if the input ends before the end-of-stream marker, while the
+    data is still being written, so a truncated download never replaces the output.
+    """
+    decompressor = bz2.BZ2Decompressor()
+    for chunk in chunks:
+        data = decompressor.decompress(chunk)
+        if data:
+            yield data
+    if not decompressor.eof:
+        raise EOFError("Compressed stream ended before the end-of-stream marker")
+
 def download_bz2_with_retry(url: str, out_path: str, max_retries: int = 3, timeout: int = 30) -> bool:
     """
     Download and decompress a bz2 file with retry logic.
     """
     for attempt in range(max_retries):
+        delay = None
         try:
-            r = requests.get(url, timeout=timeout)
-            if r.status_code == 200:
-                decompressed = bz2.decompress(r.content)
-                with open(out_path, "wb") as f:
-                    f.write(decompressed)
-                return True
-            elif r.status_code == 429:
-                logger.error("Rate limit hit. Stopping retries.")
-                return False
-            else:
-                logger.warning(f"Attempt {attempt + 1}/{max_retries}: Failed to download (Status code: {r.status_code})")
+            with SESSION.get(url, timeout=(5, timeout), stream=True) as r:
+                if r.status_code == 200:
+                    # Decompress while receiving so only one chunk is held in memory
+                    chunks = _bz2_decompress_stream(r.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE))
+                    return _write_grib_stream(chunks, out_path, url)
+                elif r.status_code in THROTTLE_STATUS_CODES:
+                    # Back off for at least as long as the server asks, and let the
+                    # host's limiter shed concurrency instead of giving up
+                    delay = _retry_delay(attempt, r.headers.get("Retry-After"))
+                    _host_limiter(url).on_throttle(delay)
+                    logger.warning("Attempt %d/%d: Throttled by server (Status code: %s)", attempt + 1, max_retries, r.status_code)
+                else:
+                    logger.warning("Attempt %d/%d: Failed to download (Status code: %s)", attempt + 1, max_retries, r.status_code)
         except Exception as e:
-            logger.warning(f"Attempt {attempt + 1}/{max_retries}: Error downloading/decompressing: {str(e)}")
+            logger.warning("Attempt %d/%d: Error downloading/decompressing: %s", attempt + 1, max_retries, e)
         
         if attempt < max_retries - 1:
-            time.sleep(2 ** attempt)  # Exponential backoff
+            time.sleep(delay if delay is not None else _retry_delay(attempt))
     
-    logger.error(f"Failed to download/decompress after {max_retries} attempts: {url}")
+    logger.error("Failed to download/decompress after %d attempts: %s", max_retries, url)
     return False
 
-def parallel_download(download_tasks: List[Tuple[str, str]], max_workers: int = 5, desc: str = "Downloading") -> None:
+# Maximum simultaneous downloads from one host. The limit is shared by every
+# parallel_download call, so models downloaded concurrently from NOMADS do not
+# add up to more connections than the server tolerates.
+MAX_DOWNLOADS_PER_HOST = 8
+
+# Status codes a server uses to ask clients to slow down
+THROTTLE_STATUS_CODES = {429, 503}
+
+class _HostLimiter:
+    """
+    Limit concurrent downloads from one host, adapting the limit to the server.
+    
+    The limit grows by one after a full limit's worth of successful downloads and
+    is halved whenever the server throttles (additive increase, multiplicative
+    decrease), staying between 1 and MAX_DOWNLOADS_PER_HOST.
+    A throttle also opens a backoff window that new downloads from the host wait out.
+    """
+    def __init__(self):
+        self.limit = max(MAX_DOWNLOADS_PER_HOST // 2, 1)
+        self.active = 0
+        self.successes = 0
+        self.resume_at = 0.0
+        self.condition = threading.Condition()
+    
+    def __enter__(self):
+        with self.condition:
+            while self.active >= self.limit:
+                self.condition.wait()
+            self.active += 1
+            pause = self.resume_at - time.monotonic()
+        # Respect a backoff window requested by the server for the whole host
+        if pause > 0:
+            time.sleep(pause)
+        return self
+    
+    def __exit__(self, *exc_info):
+        with self.condition:
+            self.active -= 1
+            self.condition.notify()
+    
+    def on_success(self) -> None:
+        with self.condition:
+            self.successes += 1
+            if self.successes >= self.limit and self.limit < MAX_DOWNLOADS_PER_HOST:
+                self.limit += 1
+                self.successes = 0
+                self.condition.notify()
+    
+    def on_throttle(self, delay: float = 0.0) -> None:
+        with self.condition:
+            self.limit = max(self.limit // 2, 1)
+            self.successes = 0
+            self.resume_at = max(self.resume_at, time.monotonic() + delay)
+
+_host_limiters: Dict[str, _HostLimiter] = {}
+_host_limiters_lock = threading.Lock()
+
+def _host_limiter(url: str) -> _HostLimiter:
+    """Get the limiter for concurrent downloads from the host of url."""
+    host = urlparse(url).netloc
+    with _host_limiters_lock:
+        if host not in _host_limiters:
+            _host_limiters[host] = _HostLimiter()
+        return _host_limiters[host]
+
+def _download_task(url: str, out_path: str) -> bool:
+    """Download one file, waiting for a free slot on its host first."""
+    if _is_complete_grib(out_path):
+        logger.debug("Skipping %s, already downloaded", out_path)
+        return True
+    limiter = _host_limiter(url)
+    with limiter:
+        if url.endswith('.bz2'):
+            success = download_bz2_with_retry(url, out_path)
+        else:
+            success = download_with_retry(url, out_path)
+    if success:
+        limiter.on_success()
+    return success
+
+def parallel_download(download_tasks: List[Tuple[str, str]], max_workers: int = MAX_DOWNLOADS_PER_HOST,
+                      desc: str = "Downloading", task=_download_task) -> None:
     """
     Download multiple files in parallel with progress tracking.
     
     Args:
         download_tasks: List of (url, output_path) tuples
-        max_workers: Maximum number of parallel downloads
+        max_workers: Maximum number of parallel downloads. Every task of a model hits the same
+            host, so workers beyond MAX_DOWNLOADS_PER_HOST would only wait on its limiter
         desc: Description for the progress bar
+        task: Callable taking (url, output_path) and returning True on success
     """
     with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures = []
-        for url, out_path in download_tasks:
-            if url.endswith('.bz2'):
-                futures.append(executor.submit(download_bz2_with_retry, url, out_path))
-            else:
-                futures.append(executor.submit(download_with_retry, url, out_path))
+        futures = [executor.submit(task, url, out_path) for url, out_path in download_tasks]
         
         # Create progress bar
         with tqdm(total=len(download_tasks), desc=desc, unit="file") as pbar:
@@ -435,9 +749,73 @@ def parallel_download(download_tasks: List[Tuple[str, str]], max_workers: int =
                     if success:
                         pbar.update(1)
                 except Exception as e:
-                    logger.error(f"Error in download task: {str(e)}")
+                    logger.error("Error in download task: %s", e)
                     pbar.update(1)
 
+# Polling interval for forecast hours not yet published; it doubles while no new
+# hour appears and resets once one does
+POLL_INITIAL_INTERVAL = 60
+POLL_MAX_INTERVAL = 600
+
+def _poll_task(url: str, out_path: str, timeout: int = 30) -> bool:
+    """
+    Make a single attempt at a file that may not be published yet.
+    
+    The next poll is the retry, so there is no backoff here, and a file that is
+    still missing is only logged at DEBUG.
+    """
+    limiter = _host_limiter(url)
+    with limiter:
+        try:
+            with SESSION.get(url, timeout=(5, timeout), stream=True) as r:
+                if r.status_code != 200:
+                    if r.status_code in THROTTLE_STATUS_CODES:
+                        limiter.on_throttle(_retry_delay(0, r.headers.get("Retry-After")))
+                    logger.debug("Not published yet (status %s): %s", r.status_code, url)
+                    return False
+                chunks = r.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE)
+                if url.endswith('.bz2'):
+                    chunks = _bz2_decompress_stream(chunks)
+                success = _write_grib_stream(chunks, out_path, url, not_grib_level=logging.DEBUG)
+        except Exception as e:
+            logger.debug("Polling %s failed: %s", url, e)
+            return False
+    if success:
+        limiter.on_success()
+    return success
+
+def poll_missing_downloads(download_tasks: List[Tuple[str, str]], budget_seconds: float,
+                           desc: str = "Polling") -> None:
+    """
+    Retry downloads whose output is still missing until all exist or the time budget runs out.
+    
+    Each poll makes one request per missing file (see _poll_task).
+    
+    Args:
+        download_tasks: List of (url, output_path) tuples
+        budget_seconds: Maximum wall-clock time to keep polling
+        desc: Description for the progress bar
+    """
+    deadline = time.monotonic() + budget_seconds
+    interval = POLL_INITIAL_INTERVAL
+    missing = [task for task in download_tasks if not _is_complete_grib(task[1])]
+    while missing:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            logger.warning("Gave up waiting for %d files that were not published in time", len(missing))
+            return
+        wait = min(interval, remaining)
+        logger.info("%d files not published yet, checking again in %.0f s", len(missing), wait)
+        time.sleep(wait)
+        
+        parallel_download(missing, desc=desc, task=_poll_task)
+        still_missing = [task for task in missing if not _is_complete_grib(task[1])]
+        if len(still_missing) < len(missing):
+            interval = POLL_INITIAL_INTERVAL
+        else:
+            interval = min(interval * 2, POLL_MAX_INTERVAL)
+        missing = still_missing
+
 def prepare_gfs_download_tasks(run_time: datetime, variables: List[str], hours: int, 
                              lat_min: float, lat_max: float, lon_min: float, lon_max: float,
                              resolution: str = '0.25', out_dir: str = "gribs") -> List[Tuple[str, str]]:
@@ -451,23 +829,25 @@ def prepare_gfs_download_tasks(run_time: datetime, variables: List[str], hours:
     run_date = run_time.strftime("%Y%m%d")
     run_str = run_time.strftime("%H")
     
+    # Parameters that do not change between forecast hours
+    static_params = {
+        "lev_2_m_above_ground": "on",
+        "lev_10_m_above_ground": "on",
+        **_filter_var_flags(variables),
+        "subregion": "",
+        "leftlon": lon_min,
+        "rightlon": lon_max,
+        "toplat": lat_max,
+        "bottomlat": lat_min,
+        "dir": config['dir_pattern'].format(date_str=run_date, run_str=run_str)
+    }
+    # Encode the static part of the query string once
+    static_query = urlencode(static_params, safe='/')
+    file_name = functools.partial(config['file_pattern'].format, run_str=run_str)
+    
     for fh in range(0, hours + 1, 1):
-        params = {
-            "file": config['file_pattern'].format(run_str=run_str, fh=fh),
-            "lev_2_m_above_ground": "on",
-            "lev_10_m_above_ground": "on",
-            "var_UGRD": "on" if "u10" in variables else "off",
-            "var_VGRD": "on" if "v10" in variables else "off",
-            "var_TMP": "on" if "t2m" in variables else "off",
-            "var_PRATE": "on" if "prate" in variables else "off",
-            "subregion": "",
-            "leftlon": lon_min,
-            "rightlon": lon_max,
-            "toplat": lat_max,
-            "bottomlat": lat_min,
-            "dir": config['dir_pattern'].format(date_str=run_date, run_str=run_str)
-        }
-        url = base_url + "?" + "&".join(f"{k}={v}" for k, v in params.items())
+        file_query = urlencode({"file": file_name(fh=fh)}, safe='/')
+        url = f"{base_url}?{file_query}&{static_query}"
         out_path = os.path.join(out_dir, "gfs_gribs", f"gfs_{resolution}_{run_date}_{run_str}_f{fh:03d}.grib2")
         download_tasks.append((url, out_path))
     
@@ -493,16 +873,23 @@ def prepare_icon_download_tasks(run_time: datetime, variables: List[str], hours:
     # Base URL for ICON global model
     base_url = f"https://opendata.dwd.de/weather/nwp/icon/grib/{run_str}"
     
-    for fh in range(0, hours + 1, 1):
-        for var in variables:
-            if var not in var_map:
-                continue
-            
-            var_dir, var_file = var_map[var]
-            # Use lowercase for directory, uppercase for filename
-            url = f"{base_url}/{var_dir}/icon_global_icosahedral_single-level_{run_date}{run_str}_{fh:03d}_{var_file}.grib2.bz2"
-            out_path = os.path.join(out_dir, "icon_gribs", f"icon_{resolution}_{run_date}_{run_str}_f{fh:03d}_{var}.grib2")
-            download_tasks.append((url, out_path))
+    # Drop unknown variables once instead of skipping them for every forecast hour
+    variables = [var for var in variables if var in var_map]
+    
+    # Everything but the forecast hour is fixed per variable, so build those parts once
+    # (lowercase for directory, uppercase for filename)
+    url_prefix = f"icon_global_icosahedral_single-level_{run_date}{run_str}"
+    out_prefix = os.path.join(out_dir, "icon_gribs", f"icon_{resolution}_{run_date}_{run_str}")
+    var_parts = {
+        var: (f"{base_url}/{var_map[var][0]}/{url_prefix}", f"_{var_map[var][1]}.grib2.bz2")
+        for var in variables
+    }
+    
+    for fh, var in itertools.product(range(0, hours + 1, 1), variables):
+        url_head, url_tail = var_parts[var]
+        url = f"{url_head}_{fh:03d}{url_tail}"
+        out_path = f"{out_prefix}_f{fh:03d}_{var}.grib2"
+        download_tasks.append((url, out_path))
     
     return download_tasks
 
@@ -527,21 +914,60 @@ def prepare_cmc_download_tasks(run_time: datetime, variables: List[str], hours:
     else:
         base_url = f"https://dd.weather.gc.ca/model_gem_global/25km/grib2/{run_str}"
     
-    for fh in range(0, hours + 1, 1):
-        for var in variables:
-            if var not in variable_map:
-                continue
-            
-            cmc_var = variable_map[var]
-            fh_patterns = [f"P{fh:03d}", f"{fh:03d}", f"P{fh:02d}", f"{fh:02d}"]
-            
-            for pattern in fh_patterns:
-                url = f"{base_url}/CMC_reg_{cmc_var}_latlon.15x.15_{run_date}{run_str}_{pattern}.grib2"
-                out_path = os.path.join(out_dir, "cmc_gribs", f"cmc_{resolution}_{run_date}_{run_str}_f{fh:03d}_{var}.grib2")
-                download_tasks.append((url, out_path))
+    # Drop unknown variables once instead of skipping them for every forecast hour
+    variables = [var for var in variables if var in variable_map]
+    
+    # Everything but the forecast hour is fixed per variable, so build those parts once
+    out_prefix = os.path.join(out_dir, "cmc_gribs", f"cmc_{resolution}_{run_date}_{run_str}")
+    url_heads = {
+        var: f"{base_url}/CMC_reg_{variable_map[var]}_latlon.15x.15_{run_date}{run_str}"
+        for var in variables
+    }
+    
+    for fh, var in itertools.product(range(0, hours + 1, 1), variables):
+        fh_patterns = [f"P{fh:03d}", f"{fh:03d}", f"P{fh:02d}", f"{fh:02d}"]
+        out_path = f"{out_prefix}_f{fh:03d}_{var}.grib2"
+        for pattern in fh_patterns:
+            download_tasks.append((f"{url_heads[var]}_{pattern}.grib2", out_path))
     
     return download_tasks
 
+def _keep_listed_tasks(download_tasks: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    """
+    Keep only tasks whose file appears in its directory listing, one per output path.
+    
+    Each directory is listed once. If a listing cannot be read, or lists none of
+    the candidate files (e.g. the server layout changed), the tasks are returned
+    unchanged rather than dropping every download.
+    """
+    listed = {}
+    for url, _ in download_tasks:
+        directory = url.rsplit('/', 1)[0]
+        if directory in listed:
+            continue
+        try:
+            listing = _get_listing(directory + '/')
+        except requests.RequestException as e:
+            logger.debug("Error listing %s: %s", directory, e)
+            listing = None
+        listed[directory] = set(GRIB2_LINK_RE.findall(listing)) if listing is not None else None
+    
+    kept = []
+    kept_paths = set()
+    for url, out_path in download_tasks:
+        directory, filename = url.rsplit('/', 1)
+        if listed[directory] is None:
+            return download_tasks
+        if filename in listed[directory] and out_path not in kept_paths:
+            kept.append((url, out_path))
+            kept_paths.add(out_path)
+    
+    if not kept:
+        logger.debug("No candidate files found in the listings, keeping all %d tasks", len(download_tasks))
+        return download_tasks
+    logger.debug("Kept %d of %d candidate tasks found in the listings", len(kept), len(download_tasks))
+    return kept
+
 def prepare_hrrr_download_tasks(run_time: datetime, variables: List[str], hours: int,
                               lat_min: float, lat_max: float, lon_min: float, lon_max: float,
                               resolution: str = '3km', out_dir: str = "gribs") -> List[Tuple[str, str]]:
@@ -555,23 +981,25 @@ def prepare_hrrr_download_tasks(run_time: datetime, variables: List[str], hours:
     run_date = run_time.strftime("%Y%m%d")
     run_str = run_time.strftime("%H")
     
+    # Parameters that do not change between forecast hours
+    static_params = {
+        "lev_2_m_above_ground": "on",
+        "lev_10_m_above_ground": "on",
+        **_filter_var_flags(variables),
+        "subregion": "",
+        "leftlon": lon_min,
+        "rightlon": lon_max,
+        "toplat": lat_max,
+        "bottomlat": lat_min,
+        "dir": f"/hrrr.{run_date}/conus"
+    }
+    # Encode the static part of the query string once
+    static_query = urlencode(static_params, safe='/')
+    file_name = functools.partial(config['file_pattern'].format, run_str=run_str)
+    
     for fh in range(0, hours + 1, 1):
-        params = {
-            "file": config['file_pattern'].format(run_str=run_str, fh=fh),
-            "lev_2_m_above_ground": "on",
-            "lev_10_m_above_ground": "on",
-            "var_UGRD": "on" if "u10" in variables else "off",
-            "var_VGRD": "on" if "v10" in variables else "off",
-            "var_TMP": "on" if "t2m" in variables else "off",
-            "var_PRATE": "on" if "prate" in variables else "off",
-            "subregion": "",
-            "leftlon": lon_min,
-            "rightlon": lon_max,
-            "toplat": lat_max,
-            "bottomlat": lat_min,
-            "dir": f"/hrrr.{run_date}/conus"
-        }
-        url = base_url + "?" + "&".join(f"{k}={v}" for k, v in params.items())
+        file_query = urlencode({"file": file_name(fh=fh)}, safe='/')
+        url = f"{base_url}?{file_query}&{static_query}"
         out_path = os.path.join(out_dir, "hrrr_gribs", f"hrrr_{resolution}_{run_date}_{run_str}_f{fh:02d}.grib2")
         download_tasks.append((url, out_path))
     
@@ -588,24 +1016,25 @@ def prepare_nam_download_tasks(run_time: datetime, variables: List[str], hours:
     run_str = run_time.strftime("%H")
     base_url = "https://nomads.ncep.noaa.gov/cgi-bin/filter_nam.pl"
     
+    # Parameters that do not change between forecast hours
+    static_params = {
+        "lev_2_m_above_ground": "on",
+        "lev_10_m_above_ground": "on",
+        "lev_surface": "on",
+        **_filter_var_flags(variables),
+        "subregion": "",
+        "leftlon": lon_min,
+        "rightlon": lon_max,
+        "toplat": lat_max,
+        "bottomlat": lat_min,
+        "dir": f"/nam.{run_date}"
+    }
+    # Encode the static part of the query string once
+    static_query = urlencode(static_params, safe='/')
+    
     for fh in range(0, hours + 1, 3):  # 3-hourly steps
-        params = {
-            "file": f"nam.t{run_str}z.awphys{fh:03d}.tm00.grib2",
-            "lev_2_m_above_ground": "on",
-            "lev_10_m_above_ground": "on",
-            "lev_surface": "on",
-            "var_UGRD": "on" if "u10" in variables else "off",
-            "var_VGRD": "on" if "v10" in variables else "off",
-            "var_TMP": "on" if "t2m" in variables else "off",
-            "var_PRATE": "on" if "prate" in variables else "off",
-            "subregion": "",
-            "leftlon": lon_min,
-            "rightlon": lon_max,
-            "toplat": lat_max,
-            "bottomlat": lat_min,
-            "dir": f"/nam.{run_date}"
-        }
-        url = base_url + "?" + "&".join(f"{k}={v}" for k, v in params.items())
+        file_query = urlencode({"file": f"nam.t{run_str}z.awphys{fh:03d}.tm00.grib2"}, safe='/')
+        url = f"{base_url}?{file_query}&{static_query}"
         out_path = os.path.join(out_dir, "nam_gribs", f"nam_{run_date}_{run_str}_f{fh:03d}.grib2")
         download_tasks.append((url, out_path))
     
@@ -622,24 +1051,25 @@ def prepare_rap_download_tasks(run_time: datetime, variables: List[str], hours:
     run_str = run_time.strftime("%H")
     base_url = "https://nomads.ncep.noaa.gov/cgi-bin/filter_rap.pl"
     
+    # Parameters that do not change between forecast hours
+    static_params = {
+        "lev_2_m_above_ground": "on",
+        "lev_10_m_above_ground": "on",
+        "lev_surface": "on",
+        **_filter_var_flags(variables),
+        "subregion": "",
+        "leftlon": lon_min,
+        "rightlon": lon_max,
+        "toplat": lat_max,
+        "bottomlat": lat_min,
+        "dir": f"/rap.{run_date}"
+    }
+    # Encode the static part of the query string once
+    static_query = urlencode(static_params, safe='/')
+    
     for fh in range(0, hours + 1, 1):  # hourly steps
-        params = {
-            "file": f"rap.t{run_str}z.awp130pgrbf{fh:02d}.grib2",
-            "lev_2_m_above_ground": "on",
-            "lev_10_m_above_ground": "on",
-            "lev_surface": "on",
-            "var_UGRD": "on" if "u10" in variables else "off",
-            "var_VGRD": "on" if "v10" in variables else "off",
-            "var_TMP": "on" if "t2m" in variables else "off",
-            "var_PRATE": "on" if "prate" in variables else "off",
-            "subregion": "",
-            "leftlon": lon_min,
-            "rightlon": lon_max,
-            "toplat": lat_max,
-            "bottomlat": lat_min,
-            "dir": f"/rap.{run_date}"
-        }
-        url = base_url + "?" + "&".join(f"{k}={v}" for k, v in params.items())
+        file_query = urlencode({"file": f"rap.t{run_str}z.awp130pgrbf{fh:02d}.grib2"}, safe='/')
+        url = f"{base_url}?{file_query}&{static_query}"
         out_path = os.path.join(out_dir, "rap_gribs", f"rap_{run_date}_{run_str}_f{fh:02d}.grib2")
         download_tasks.append((url, out_path))
     
@@ -656,226 +1086,169 @@ def prepare_nbm_download_tasks(run_time: datetime, variables: List[str], hours:
     run_str = run_time.strftime("%H")
     base_url = "https://nomads.ncep.noaa.gov/cgi-bin/filter_nbm.pl"
     
+    # Parameters that do not change between forecast hours
+    static_params = {
+        "lev_2_m_above_ground": "on",
+        "lev_10_m_above_ground": "on",
+        "lev_surface": "on",
+        **_filter_var_flags(variables),
+        "subregion": "",
+        "leftlon": lon_min,
+        "rightlon": lon_max,
+        "toplat": lat_max,
+        "bottomlat": lat_min,
+        "dir": f"/nbm.{run_date}"
+    }
+    # Encode the static part of the query string once
+    static_query = urlencode(static_params, safe='/')
+    
     for fh in range(0, hours + 1, 1):  # hourly steps
-        params = {
-            "file": f"blend.t{run_str}z.core.f{fh:03d}.co.grib2",
-            "lev_2_m_above_ground": "on",
-            "lev_10_m_above_ground": "on",
-            "lev_surface": "on",
-            "var_UGRD": "on" if "u10" in variables else "off",
-            "var_VGRD": "on" if "v10" in variables else "off",
-            "var_TMP": "on" if "t2m" in variables else "off",
-            "var_PRATE": "on" if "prate" in variables else "off",
-            "subregion": "",
-            "leftlon": lon_min,
-            "rightlon": lon_max,
-            "toplat": lat_max,
-            "bottomlat": lat_min,
-            "dir": f"/nbm.{run_date}"
-        }
-        url = base_url + "?" + "&".join(f"{k}={v}" for k, v in params.items())
+        file_query = urlencode({"file": f"blend.t{run_str}z.core.f{fh:03d}.co.grib2"}, safe='/')
+        url = f"{base_url}?{file_query}&{static_query}"
         out_path = os.path.join(out_dir, "nbm_gribs", f"nbm_{run_date}_{run_str}_f{fh:03d}.grib2")
         download_tasks.append((url, out_path))
     
     return download_tasks
 
-def download_gfs_gribs(lat_min, lat_max, lon_min, lon_max, variables, hours=72, out_dir="gribs", resolution='0.25'):
+def _download_model_gribs(model: str, get_latest_run, prepare_tasks, lat_min, lat_max, lon_min, lon_max,
+                          variables, hours, out_dir, label: Optional[str] = None, poll_seconds: int = 0):
     """
-    Download GFS GRIB files for the specified region and variables.
+    Find a model's latest run and download its GRIB files. Shared by every download_*_gribs.
+    
+    Args:
+        model: Model name, used for the output subdirectory and log messages
+        get_latest_run: Callable returning the latest run time, or None
+        prepare_tasks: Callable taking the run time and returning (url, out_path) tasks
+        label: Model description used when logging the chosen run, defaults to model
+        poll_seconds: If positive, poll this long for files that were not published yet
     """
     try:
+        _validate_request(lat_min, lat_max, lon_min, lon_max, variables, hours)
+        
         # Create output directory if it doesn't exist
-        output_dir = os.path.join(out_dir, "gfs_gribs")
-        os.makedirs(output_dir, exist_ok=True)
+        os.makedirs(os.path.join(out_dir, f"{model.lower()}_gribs"), exist_ok=True)
         
         # Get latest available run
-        run_time = get_latest_gfs_run()
+        run_time = get_latest_run()
         if run_time is None:
-            logger.error("No available GFS runs found in the last 3 days")
+            logger.error(f"No available {model} runs found")
             return
         
-        logger.info(f"Using GFS {resolution}° run from {run_time.strftime('%Y-%m-%d %H:%M UTC')}")
-        
-        # Prepare download tasks
-        download_tasks = prepare_gfs_download_tasks(
-            run_time, variables, hours, lat_min, lat_max, lon_min, lon_max, resolution, out_dir
-        )
+        logger.info(f"Using {label or model} run from {run_time.strftime('%Y-%m-%d %H:%M UTC')}")
         
         # Execute downloads in parallel
-        parallel_download(download_tasks, desc="Downloading GFS data")
+        download_tasks = prepare_tasks(run_time)
+        parallel_download(download_tasks, desc=f"Downloading {model} data")
+        if poll_seconds > 0:
+            poll_missing_downloads(download_tasks, poll_seconds, desc=f"Polling {model} data")
         
     except Exception as e:
-        logger.error(f"Error downloading GFS data: {str(e)}")
+        logger.error(f"Error downloading {model} data: {str(e)}")
+
+def download_gfs_gribs(lat_min, lat_max, lon_min, lon_max, variables, hours=72, out_dir="gribs", resolution='0.25'):
+    """
+    Download GFS GRIB files for the specified region and variables.
+    """
+    _download_model_gribs(
+        "GFS", get_latest_gfs_run,
+        lambda run_time: prepare_gfs_download_tasks(
+            run_time, variables, hours, lat_min, lat_max, lon_min, lon_max, resolution, out_dir
+        ),
+        lat_min, lat_max, lon_min, lon_max, variables, hours, out_dir, label=f"GFS {resolution}°"
+    )
+
+def _latest_icon_run_time() -> Optional[datetime]:
+    """Get the timestamp of the latest ICON run, or None."""
+    run = get_latest_icon_run()
+    return run['timestamp'] if run is not None else None
 
 def download_icon_gribs(lat_min, lat_max, lon_min, lon_max, variables, hours=72, out_dir="gribs", resolution='13km'):
     """
     Download ICON GRIB files for the specified region and variables.
     """
-    try:
-        # Create output directory if it doesn't exist
-        output_dir = os.path.join(out_dir, "icon_gribs")
-        os.makedirs(output_dir, exist_ok=True)
-        
-        # Get latest available run
-        run_time = get_latest_icon_run()
-        if run_time is None:
-            logger.error("No available ICON runs found in the last 3 days")
-            return
-        
-        logger.info(f"Using ICON {resolution} run from {run_time['timestamp'].strftime('%Y-%m-%d %H:%M UTC')}")
-        
-        # Prepare download tasks
-        download_tasks = prepare_icon_download_tasks(
-            run_time['timestamp'], variables, hours, resolution, out_dir
-        )
-        
-        # Execute downloads in parallel
-        parallel_download(download_tasks, desc="Downloading ICON data")
-        
-    except Exception as e:
-        logger.error(f"Error downloading ICON data: {str(e)}")
+    _download_model_gribs(
+        "ICON", _latest_icon_run_time,
+        lambda run_time: prepare_icon_download_tasks(run_time, variables, hours, resolution, out_dir),
+        lat_min, lat_max, lon_min, lon_max, variables, hours, out_dir, label=f"ICON {resolution}"
+    )
 
 def download_cmc_gribs(lat_min, lat_max, lon_min, lon_max, variables, hours=72, out_dir="gribs", resolution='15km'):
     """
     Download CMC GRIB files for the specified region and variables.
     """
-    try:
-        # Create output directory if it doesn't exist
-        output_dir = os.path.join(out_dir, "cmc_gribs")
-        os.makedirs(output_dir, exist_ok=True)
-        
-        # Get latest available run
-        run_time = get_latest_cmc_run()
-        if run_time is None:
-            logger.error("No available CMC runs found in the last 3 days")
-            return
-        
-        logger.info(f"Using CMC run from {run_time.strftime('%Y-%m-%d %H:%M UTC')}")
-        
-        # Prepare download tasks
-        download_tasks = prepare_cmc_download_tasks(
-            run_time, variables, hours, resolution, out_dir
-        )
-        
-        # Execute downloads in parallel
-        parallel_download(download_tasks, desc="Downloading CMC data")
-        
-    except Exception as e:
-        logger.error(f"Error downloading CMC data: {str(e)}")
+    # Only one of the filename patterns exists for each file, so drop the others up front
+    _download_model_gribs(
+        "CMC", get_latest_cmc_run,
+        lambda run_time: _keep_listed_tasks(
+            prepare_cmc_download_tasks(run_time, variables, hours, resolution, out_dir)
+        ),
+        lat_min, lat_max, lon_min, lon_max, variables, hours, out_dir
+    )
 
-def download_hrrr_gribs(lat_min, lat_max, lon_min, lon_max, variables, hours=18, out_dir="gribs", resolution='3km'):
+def download_hrrr_gribs(lat_min, lat_max, lon_min, lon_max, variables, hours=18, out_dir="gribs", resolution='3km',
+                        poll_seconds=0):
     """
     Download HRRR GRIB files for the specified region and variables.
+    
+    HRRR publishes forecast hours while the run is still in progress. With a
+    positive poll_seconds, hours that were not available yet are polled for
+    until they appear or that many seconds have passed.
     """
-    try:
-        # Create output directory if it doesn't exist
-        output_dir = os.path.join(out_dir, "hrrr_gribs")
-        os.makedirs(output_dir, exist_ok=True)
-        
-        # Get latest available run
-        run_time = get_latest_hrrr_run()
-        if run_time is None:
-            logger.error("No available HRRR runs found in the last 2 days")
-            return
-        
-        logger.info(f"Using HRRR {resolution} run from {run_time.strftime('%Y-%m-%d %H:%M UTC')}")
-        
-        # Prepare download tasks
-        download_tasks = prepare_hrrr_download_tasks(
+    _download_model_gribs(
+        "HRRR", get_latest_hrrr_run,
+        lambda run_time: prepare_hrrr_download_tasks(
             run_time, variables, hours, lat_min, lat_max, lon_min, lon_max, resolution, out_dir
-        )
-        
-        # Execute downloads in parallel
-        parallel_download(download_tasks, desc="Downloading HRRR data")
-        
-    except Exception as e:
-        logger.error(f"Error downloading HRRR data: {str(e)}")
+        ),
+        lat_min, lat_max, lon_min, lon_max, variables, hours, out_dir,
+        label=f"HRRR {resolution}", poll_seconds=poll_seconds
+    )
 
 def download_nam_gribs(lat_min, lat_max, lon_min, lon_max, variables, hours=84, out_dir="gribs"):
     """
     Download NAM GRIB files for the specified region and variables.
     """
-    try:
-        # Create output directory if it doesn't exist
-        output_dir = os.path.join(out_dir, "nam_gribs")
-        os.makedirs(output_dir, exist_ok=True)
-        
-        # Get latest available run
-        run_time = get_latest_nam_run()
-        if run_time is None:
-            logger.error("No available NAM runs found in the last 3 days")
-            return
-        
-        logger.info(f"Using NAM run from {run_time.strftime('%Y-%m-%d %H:%M UTC')}")
-        
-        # Prepare download tasks
-        download_tasks = prepare_nam_download_tasks(
+    _download_model_gribs(
+        "NAM", get_latest_nam_run,
+        lambda run_time: prepare_nam_download_tasks(
             run_time, variables, hours, lat_min, lat_max, lon_min, lon_max, out_dir
-        )
-        
-        # Execute downloads in parallel
-        parallel_download(download_tasks, desc="Downloading NAM data")
-        
-    except Exception as e:
-        logger.error(f"Error downloading NAM data: {str(e)}")
+        ),
+        lat_min, lat_max, lon_min, lon_max, variables, hours, out_dir
+    )
 
 def download_rap_gribs(lat_min, lat_max, lon_min, lon_max, variables, hours=18, out_dir="gribs"):
     """
     Download RAP GRIB files for the specified region and variables.
     """
-    try:
-        # Create output directory if it doesn't exist
-        output_dir = os.path.join(out_dir, "rap_gribs")
-        os.makedirs(output_dir, exist_ok=True)
-        
-        # Get latest available run
-        run_time = get_latest_rap_run()
-        if run_time is None:
-            logger.error("No available RAP runs found in the last 2 days")
-            return
-        
-        logger.info(f"Using RAP run from {run_time.strftime('%Y-%m-%d %H:%M UTC')}")
-        
-        # Prepare download tasks
-        download_tasks = prepare_rap_download_tasks(
+    _download_model_gribs(
+        "RAP", get_latest_rap_run,
+        lambda run_time: prepare_rap_download_tasks(
             run_time, variables, hours, lat_min, lat_max, lon_min, lon_max, out_dir
-        )
-        
-        # Execute downloads in parallel
-        parallel_download(download_tasks, desc="Downloading RAP data")
-        
-    except Exception as e:
-        logger.error(f"Error downloading RAP data: {str(e)}")
+        ),
+        lat_min, lat_max, lon_min, lon_max, variables, hours, out_dir
+    )
 
 def download_nbm_gribs(lat_min, lat_max, lon_min, lon_max, variables, hours=72, out_dir="gribs"):
     """
     Download NBM GRIB files for the specified region and variables.
     """
-    try:
-        # Create output directory if it doesn't exist
-        output_dir = os.path.join(out_dir, "nbm_gribs")
-        os.makedirs(output_dir, exist_ok=True)
-        
-        # Get latest available run
-        run_time = get_latest_nbm_run()
-        if run_time is None:
-            logger.error("No available NBM runs found in the last 2 days")
-            return
-        
-        logger.info(f"Using NBM run from {run_time.strftime('%Y-%m-%d %H:%M UTC')}")
-        
-        # Prepare download tasks
-        download_tasks = prepare_nbm_download_tasks(
+    _download_model_gribs(
+        "NBM", get_latest_nbm_run,
+        lambda run_time: prepare_nbm_download_tasks(
             run_time, variables, hours, lat_min, lat_max, lon_min, lon_max, out_dir
-        )
-        
-        # Execute downloads in parallel
-        parallel_download(download_tasks, desc="Downloading NBM data")
-        
-    except Exception as e:
-        logger.error(f"Error downloading NBM data: {str(e)}")
+        ),
+        lat_min, lat_max, lon_min, lon_max, variables, hours, out_dir
+    )
 
 if __name__ == "__main__":
+    # Set up logging. Download threads only enqueue records; a single listener
+    # thread formats and writes them, so workers never contend on the stream lock
+    console = logging.StreamHandler()
+    console.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s', datefmt='%Y-%m-%d %H:%M:%S'))
+    log_queue = queue.SimpleQueue()
+    logging.basicConfig(level=logging.INFO, format='%(message)s', handlers=[logging.handlers.QueueHandler(log_queue)])
+    log_listener = logging.handlers.QueueListener(log_queue, console)
+    log_listener.start()
+    
     # Halifax Harbour region
     lat_min, lat_max = 44.5, 44.8
     lon_min, lon_max = -63.6, -63.4
@@ -893,18 +1266,24 @@ if __name__ == "__main__":
     forecast_hours = 72
     
     logger.info("Starting forecast data download...")
-    logger.info("Downloading GFS data...")
-    download_gfs_gribs(lat_min, lat_max, lon_min, lon_max, variables, hours=forecast_hours, resolution=resolutions['gfs'])
-    logger.info("\nDownloading ICON data...")
-    download_icon_gribs(lat_min, lat_max, lon_min, lon_max, variables, hours=forecast_hours, resolution=resolutions['icon'])
-    logger.info("\nDownloading CMC data...")
-    download_cmc_gribs(lat_min, lat_max, lon_min, lon_max, variables, hours=forecast_hours, resolution=resolutions['cmc'])
-    logger.info("\nDownloading HRRR data...")
-    download_hrrr_gribs(lat_min, lat_max, lon_min, lon_max, variables, hours=forecast_hours, resolution=resolutions['hrrr'])
-    logger.info("\nDownloading NAM data...")
-    download_nam_gribs(lat_min, lat_max, lon_min, lon_max, variables, hours=forecast_hours)
-    logger.info("\nDownloading RAP data...")
-    download_rap_gribs(lat_min, lat_max, lon_min, lon_max, variables, hours=forecast_hours)
-    logger.info("\nDownloading NBM data...")
-    download_nbm_gribs(lat_min, lat_max, lon_min, lon_max, variables, hours=forecast_hours)
-    logger.info("Download complete!") 
\ No newline at end of file
+    
+    # Each model is served by its own host, so download all models concurrently
+    downloads = [
+        ("GFS", download_gfs_gribs, {'resolution': resolutions['gfs']}),
+        ("ICON", download_icon_gribs, {'resolution': resolutions['icon']}),
+        ("CMC", download_cmc_gribs, {'resolution': resolutions['cmc']}),
+        ("HRRR", download_hrrr_gribs, {'resolution': resolutions['hrrr']}),
+        ("NAM", download_nam_gribs, {}),
+        ("RAP", download_rap_gribs, {}),
+        ("NBM", download_nbm_gribs, {})
+    ]
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(downloads)) as executor:
+        futures = {
+            executor.submit(download, lat_min, lat_max, lon_min, lon_max, variables, hours=forecast_hours, **kwargs): model
+            for model, download, kwargs in downloads
+        }
+        for future in concurrent.futures.as_completed(futures):
+            future.result()
+            logger.info(f"Finished downloading {futures[future]} data")
+    logger.info("Download complete!")
+    log_listener.stop()
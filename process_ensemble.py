@@ -1,162 +1,338 @@
+import os
+import hashlib
+import json
+import threading
+import concurrent.futures
 import pandas as pd
 import numpy as np
 import logging
 import xarray as xr
+import cfgrib
 from datetime import datetime
 import re
 
 logger = logging.getLogger(__name__)
 
-def _extract_var(ds, varnames, valid_time):
-    """Helper to extract a variable from a dataset, handling scalars and arrays."""
+# Maximum number of GRIB files opened concurrently per model
+MAX_PROCESS_WORKERS = 8
+
+# How each model's files are read: the keys every message is filtered on, the
+# filename pattern holding the forecast hour and the names each variable may have
+_MODEL_SPECS = {
+    'HRRR': {
+        'filter_by_keys': None,
+        'forecast_hour': re.compile(r'f(\d{2})\.grib2$'),
+        'u10': ['u10', 'UGRD', 'UGRD_10m'],
+        'v10': ['v10', 'VGRD', 'VGRD_10m'],
+        't2m': ['t2m', 'TMP', '2t', 'TMP_2m'],
+        'prate': ['prate', 'PRATE']
+    },
+    'GFS': {
+        'filter_by_keys': {'stepType': 'instant'},
+        'forecast_hour': re.compile(r'f(\d{3})\.grib2$'),
+        'u10': ['u10', 'UGRD', 'UGRD_10m'],
+        'v10': ['v10', 'VGRD', 'VGRD_10m'],
+        't2m': ['t2m', 'TMP', '2t', 'TMP_2m'],
+        'prate': ['prate', 'PRATE']
+    },
+    'ICON': {
+        'forecast_hour': re.compile(r'_f(\d{3})_'),
+        'u10': ['u10', 'U_10M'],
+        'v10': ['v10', 'V_10M'],
+        't2m': ['t2m', 'T_2M'],
+        'prate': ['prate', 'PRATE']
+    },
+    'CMC': {
+        'filter_by_keys': None,
+        'forecast_hour': re.compile(r'f(\d{3})_'),
+        'u10': ['u10', 'UGRD_TGL_10m'],
+        'v10': ['v10', 'VGRD_TGL_10m'],
+        't2m': ['t2m', 'TMP_TGL_2m'],
+        'prate': ['prate', 'APCP_SFC_0']
+    },
+    'NAM': {
+        'filter_by_keys': None,
+        'forecast_hour': re.compile(r'f(\d{3})\.grib2$'),
+        'u10': ['u10', 'UGRD', 'UGRD_10m'],
+        'v10': ['v10', 'VGRD', 'VGRD_10m'],
+        't2m': ['t2m', 'TMP', '2t', 'TMP_2m'],
+        'prate': ['prate', 'PRATE']
+    }
+}
+
+# Values extracted from each GRIB file, keyed by path and validated against the
+# file's mtime and size, so unchanged downloads are not decoded again on rerun
+EXTRACT_CACHE_PATH = os.path.join("gribs", ".extract_cache.json")
+# Bump whenever the extraction or the record layout changes. Together with a digest
+# of _MODEL_SPECS it tags the cache file, which is discarded when the tag differs.
+EXTRACT_CACHE_VERSION = 2
+_EXTRACT_CACHE_FORMAT = f"{EXTRACT_CACHE_VERSION}-" + hashlib.sha1(json.dumps(
+    _MODEL_SPECS, sort_keys=True, default=lambda pattern: pattern.pattern).encode()).hexdigest()[:12]
+_extract_cache = None
+_extract_cache_lock = threading.Lock()
+
+def _load_extract_cache():
+    """Load the persisted extraction cache on first use. Must be called with the lock held."""
+    global _extract_cache
+    if _extract_cache is None:
+        try:
+            with open(EXTRACT_CACHE_PATH) as f:
+                data = json.load(f)
+            if data.get('format') != _EXTRACT_CACHE_FORMAT:
+                raise ValueError(f"cache format {data.get('format')!r} is not {_EXTRACT_CACHE_FORMAT!r}")
+            _extract_cache = data['records']
+        except (OSError, ValueError, KeyError, AttributeError) as e:
+            logger.debug(f"Starting with an empty extraction cache: {e}")
+            _extract_cache = {}
+    return _extract_cache
+
+def _save_extract_cache():
+    """Persist the extraction cache atomically, dropping entries for deleted files."""
+    with _extract_cache_lock:
+        cache = _load_extract_cache()
+        for key in [key for key in cache if not all(os.path.exists(f) for f in key.split('|'))]:
+            del cache[key]
+        try:
+            os.makedirs(os.path.dirname(EXTRACT_CACHE_PATH), exist_ok=True)
+            tmp_path = EXTRACT_CACHE_PATH + ".part"
+            with open(tmp_path, "w") as f:
+                json.dump({'format': _EXTRACT_CACHE_FORMAT, 'records': cache}, f)
+            os.replace(tmp_path, EXTRACT_CACHE_PATH)
+        except OSError as e:
+            logger.warning(f"Could not save extraction cache: {e}")
+
+def _file_stamp(files):
+    """Get the (mtime, size) of each file, which changes whenever a download is replaced."""
+    return [[st.st_mtime_ns, st.st_size] for st in map(os.stat, files)]
+
+def _cached_record(files):
+    """Get the record extracted earlier from files, or None if any of them has changed."""
+    try:
+        stamp = _file_stamp(files)
+    except OSError:
+        return None
+    with _extract_cache_lock:
+        entry = _load_extract_cache().get('|'.join(files))
+    if entry is None or entry.get('stamp') != stamp:
+        return None
+    try:
+        return (pd.to_datetime(np.array(entry['valid_time'], dtype='datetime64[ns]')), entry['forecast_hour'],
+                *(np.asarray(entry[var], dtype=np.float32) for var in ('u10', 'v10', 't2m', 'prate')))
+    except (KeyError, TypeError, ValueError) as e:
+        logger.debug(f"Ignoring unreadable cached values for {files}: {e}")
+        return None
+
+def _store_record(files, record):
+    """Remember the record extracted from files until they change."""
+    valid_time, forecast_hour, u10, v10, t2m, prate = record
+    try:
+        stamp = _file_stamp(files)
+    except OSError:
+        return
+    entry = {
+        'stamp': stamp,
+        'valid_time': [vt.isoformat() for vt in valid_time],
+        'forecast_hour': forecast_hour,
+        **{var: np.asarray(values, dtype=np.float32).tolist()
+           for var, values in zip(('u10', 'v10', 't2m', 'prate'), (u10, v10, t2m, prate))}
+    }
+    with _extract_cache_lock:
+        _load_extract_cache()['|'.join(files)] = entry
+
+def _extract_var(datasets, varnames, n):
+    """
+    Extract the first n values of the first variable in varnames present in any of datasets.
+    
+    Missing variables and short arrays are padded with NaN by filling a
+    preallocated float32 vector in place.
+    """
+    out = np.full(n, np.nan, dtype=np.float32)
     for var in varnames:
-        if var in ds:
-            arr = ds[var].values
-            # If scalar, make it an array
-            if np.isscalar(arr):
-                arr = np.array([arr])
-            arr = np.asarray(arr).flatten()
-            # Pad or trim to match valid_time
-            if len(arr) < len(valid_time):
-                arr = np.pad(arr, (0, len(valid_time)-len(arr)), constant_values=np.nan)
-            elif len(arr) > len(valid_time):
-                arr = arr[:len(valid_time)]
-            return arr
-    return np.full(len(valid_time), np.nan)
+        for ds in datasets:
+            if var in ds.variables:
+                # to_numpy always returns an ndarray; ravel only copies if it has to
+                arr = np.ravel(ds[var].to_numpy())
+                k = min(arr.size, n)
+                out[:k] = arr[:k]
+                return out
+    return out
+
+def _open_grib_levels(file, filter_by_keys=None):
+    """
+    Open every message group in a GRIB file with a single cfgrib.open_datasets call.
+    
+    This replaces one filtered open per level, each of which re-read the file's index.
+    
+    Args:
+        file (str): Path to the GRIB file
+        filter_by_keys (dict): Optional keys applied to every message, e.g. stepType
+        
+    Returns:
+        dict: List of datasets keyed by (typeOfLevel, level). A level can span several
+            datasets when its messages differ in other keys, such as stepType
+    """
+    levels = {}
+    backend_kwargs = {'filter_by_keys': filter_by_keys} if filter_by_keys else {}
+    for ds in cfgrib.open_datasets(file, backend_kwargs=backend_kwargs):
+        type_of_level = next((ds[var].attrs.get('GRIB_typeOfLevel') for var in ds.data_vars), None)
+        if type_of_level is None:
+            continue
+        coord = ds.coords.get(type_of_level)
+        if coord is not None and coord.ndim > 0:
+            for level in coord.values:
+                levels.setdefault((type_of_level, int(level)), []).append(ds.sel({type_of_level: level}))
+        else:
+            level = int(coord.values) if coord is not None else 0
+            levels.setdefault((type_of_level, level), []).append(ds)
+    return levels
+
+def _level_datasets(levels, type_of_level, level=0):
+    """Return the datasets for a level, or none so its variables read as NaN."""
+    return levels.get((type_of_level, level), [])
 
 def _print_ds_debug(ds, label):
+    # The dataset repr is costly to format, so skip everything unless it will be emitted
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
     logger.debug(f"{label} dataset structure: {ds}")
     logger.debug(f"Variables: {list(ds.variables.keys())}")
     for var in ds.variables:
         logger.debug(f"{label} variable '{var}': shape {ds[var].shape}, dtype {ds[var].dtype}")
 
-def process_hrrr_data(hrrr_files):
+def _extract_records(extract, items):
     """
-    Process HRRR GRIB files and convert to pandas DataFrame.
+    Run extract over items in a thread pool and keep the records it produced, in order.
+    
+    Opening and decoding GRIB files is spent in eccodes and file reads rather than
+    in Python, so files are processed concurrently.
+    """
+    if not items:
+        return []
+    with concurrent.futures.ThreadPoolExecutor(max_workers=min(MAX_PROCESS_WORKERS, len(items))) as executor:
+        return [record for record in executor.map(extract, items) if record is not None]
+
+def _model_frame(records, model):
     """
+    Build a model's DataFrame from its per-file arrays, deriving every column in one pass.
+    
+    Args:
+        records (list): (valid_time, forecast_hour, u10, v10, t2m, prate) per file
+        model (str): Value for the 'model' column
+        
+    Returns:
+        pd.DataFrame: One row per valid time
+    """
+    if not records:
+        return pd.DataFrame()
+    valid_times, forecast_hours, u10, v10, t2m, prate = zip(*records)
+    # GRIB2 packing carries well under float32 precision, so derive in float32
+    u10, v10, t2m, prate = (np.concatenate(arrays).astype(np.float32, copy=False) for arrays in (u10, v10, t2m, prate))
+    
+    return pd.DataFrame({
+        'timestamp': np.concatenate(valid_times).astype('datetime64[ns]', copy=False),
+        'forecast_hour': np.repeat(np.asarray(forecast_hours, dtype=np.int32), [len(vt) for vt in valid_times]),
+        # Convert temperature from Kelvin to Celsius
+        'temperature': t2m - 273.15,
+        'wind_speed': np.hypot(u10, v10),
+        'wind_direction': np.rad2deg(np.arctan2(u10, v10)) % 360,
+        # Convert precipitation to mm/hour
+        'precipitation': prate * 3600,
+        'model': model
+    })
+
+def _process_files(files, model):
+    """
+    Process a model that publishes all variables of a forecast hour in one GRIB file.
+    
+    Args:
+        files (list): Paths to the model's GRIB files
+        model (str): Key into _MODEL_SPECS, also used for the 'model' column
+        
+    Returns:
+        pd.DataFrame: Processed data, empty on failure
+    """
+    spec = _MODEL_SPECS[model]
     try:
-        data = []
-        for i, file in enumerate(hrrr_files):
-            try:
-                ds_wind = xr.open_dataset(file, engine='cfgrib', filter_by_keys={'typeOfLevel': 'heightAboveGround', 'level': 10})
-                ds_temp = xr.open_dataset(file, engine='cfgrib', filter_by_keys={'typeOfLevel': 'heightAboveGround', 'level': 2})
-                ds_prate = xr.open_dataset(file, engine='cfgrib', filter_by_keys={'typeOfLevel': 'surface'})
-                if i == 0:
-                    _print_ds_debug(ds_wind, 'HRRR wind')
-                    _print_ds_debug(ds_temp, 'HRRR temp')
-                    _print_ds_debug(ds_prate, 'HRRR prate')
-            except Exception as e:
-                logger.warning(f"Could not open HRRR datasets for {file}: {e}")
-                continue
-            # Extract valid time
-            valid_time = ds_wind['time'].values
-            if np.isscalar(valid_time):
-                valid_time = np.array([valid_time])
-            valid_time = pd.to_datetime(valid_time)
-            
-            # Extract forecast hour from filename
-            match = re.search(r'f(\d{2})\.grib2$', file)
+        def extract(item):
+            i, file = item
+            # Extract forecast hour from filename before opening anything
+            match = spec['forecast_hour'].search(file)
             if match:
                 forecast_hour = int(match.group(1))
             else:
                 logger.warning(f"Could not extract forecast hour from filename: {file}")
-                continue
+                return None
             
-            # Extract variables
-            u10 = _extract_var(ds_wind, ['u10', 'UGRD', 'UGRD_10m'], valid_time)
-            v10 = _extract_var(ds_wind, ['v10', 'VGRD', 'VGRD_10m'], valid_time)
-            t2m = _extract_var(ds_temp, ['t2m', 'TMP', '2t', 'TMP_2m'], valid_time)
-            prate = _extract_var(ds_prate, ['prate', 'PRATE'], valid_time)
-            
-            # Calculate wind speed and direction
-            wind_speed = np.sqrt(u10**2 + v10**2)
-            wind_direction = (np.arctan2(u10, v10) * 180 / np.pi) % 360
-            
-            # Convert temperature from Kelvin to Celsius
-            temperature = t2m - 273.15
-            
-            # Convert precipitation to mm/hour
-            precipitation = prate * 3600
+            record = _cached_record([file])
+            if record is not None:
+                return record
+            levels = {}
+            try:
+                levels = _open_grib_levels(file, spec['filter_by_keys'])
+                ds_wind = _level_datasets(levels, 'heightAboveGround', 10)
+                ds_temp = _level_datasets(levels, 'heightAboveGround', 2)
+                ds_prate = _level_datasets(levels, 'surface')
+                if i == 0:
+                    for label, group in (('wind', ds_wind), ('temp', ds_temp), ('prate', ds_prate)):
+                        for ds in group:
+                            _print_ds_debug(ds, f'{model} {label}')
+                if not ds_wind or not ds_temp:
+                    logger.warning(f"No 10 m wind or 2 m temperature level in {model} file {file}, skipping")
+                    return None
+                
+                # Extract valid time
+                valid_time = pd.DatetimeIndex(np.atleast_1d(ds_wind[0]['time'].to_numpy()))
+                
+                # Extract variables
+                u10 = _extract_var(ds_wind, spec['u10'], len(valid_time))
+                v10 = _extract_var(ds_wind, spec['v10'], len(valid_time))
+                t2m = _extract_var(ds_temp, spec['t2m'], len(valid_time))
+                prate = _extract_var(ds_prate, spec['prate'], len(valid_time))
+            except Exception as e:
+                logger.warning(f"Could not read {model} datasets for {file}: {e}")
+                return None
+            finally:
+                # Everything needed is in memory now, so release the files right away
+                for group in levels.values():
+                    for ds in group:
+                        ds.close()
             
-            for j, vt in enumerate(valid_time):
-                data.append({
-                    'timestamp': vt,
-                    'forecast_hour': forecast_hour,
-                    'temperature': float(temperature[j]) if j < len(temperature) else np.nan,
-                    'wind_speed': float(wind_speed[j]) if j < len(wind_speed) else np.nan,
-                    'wind_direction': float(wind_direction[j]) if j < len(wind_direction) else np.nan,
-                    'precipitation': float(precipitation[j]) if j < len(precipitation) else np.nan,
-                    'model': 'HRRR'
-                })
-        return pd.DataFrame(data)
+            record = (valid_time, forecast_hour, u10, v10, t2m, prate)
+            _store_record([file], record)
+            return record
+        
+        records = _extract_records(extract, list(enumerate(files)))
+        _save_extract_cache()
+        return _model_frame(records, model)
     except Exception as e:
-        logger.error(f"Error processing HRRR data: {str(e)}")
+        logger.error(f"Error processing {model} data: {str(e)}")
         return pd.DataFrame()
 
+def process_hrrr_data(hrrr_files):
+    """
+    Process HRRR GRIB files and convert to pandas DataFrame.
+    """
+    return _process_files(hrrr_files, 'HRRR')
+
 def process_gfs_data(gfs_files):
     """
     Process GFS GRIB files and convert to pandas DataFrame.
     """
-    try:
-        data = []
-        for i, file in enumerate(gfs_files):
-            try:
-                ds_wind = xr.open_dataset(file, engine='cfgrib', filter_by_keys={'typeOfLevel': 'heightAboveGround', 'level': 10, 'stepType': 'instant'})
-                ds_temp = xr.open_dataset(file, engine='cfgrib', filter_by_keys={'typeOfLevel': 'heightAboveGround', 'level': 2, 'stepType': 'instant'})
-                ds_prate = xr.open_dataset(file, engine='cfgrib', filter_by_keys={'typeOfLevel': 'surface', 'stepType': 'instant'})
-                if i == 0:
-                    _print_ds_debug(ds_wind, 'GFS wind')
-                    _print_ds_debug(ds_temp, 'GFS temp')
-                    _print_ds_debug(ds_prate, 'GFS prate')
-            except Exception as e:
-                logger.warning(f"Could not open GFS datasets for {file}: {e}")
-                continue
-            valid_time = ds_wind['time'].values
-            if np.isscalar(valid_time):
-                valid_time = np.array([valid_time])
-            valid_time = pd.to_datetime(valid_time)
-            
-            # Extract forecast hour from filename
-            match = re.search(r'f(\d{3})\.grib2$', file)
-            if match:
-                forecast_hour = int(match.group(1))
-            else:
-                logger.warning(f"Could not extract forecast hour from filename: {file}")
-                continue
-            
-            u10 = _extract_var(ds_wind, ['u10', 'UGRD', 'UGRD_10m'], valid_time)
-            v10 = _extract_var(ds_wind, ['v10', 'VGRD', 'VGRD_10m'], valid_time)
-            t2m = _extract_var(ds_temp, ['t2m', 'TMP', '2t', 'TMP_2m'], valid_time)
-            prate = _extract_var(ds_prate, ['prate', 'PRATE'], valid_time)
-            wind_speed = np.sqrt(u10**2 + v10**2)
-            wind_direction = (np.arctan2(u10, v10) * 180 / np.pi) % 360
-            temperature = t2m - 273.15
-            precipitation = prate * 3600
-            for j, vt in enumerate(valid_time):
-                data.append({
-                    'timestamp': vt,
-                    'forecast_hour': forecast_hour,
-                    'temperature': float(temperature[j]) if j < len(temperature) else np.nan,
-                    'wind_speed': float(wind_speed[j]) if j < len(wind_speed) else np.nan,
-                    'wind_direction': float(wind_direction[j]) if j < len(wind_direction) else np.nan,
-                    'precipitation': float(precipitation[j]) if j < len(precipitation) else np.nan,
-                    'model': 'GFS'
-                })
-        return pd.DataFrame(data)
-    except Exception as e:
-        logger.error(f"Error processing GFS data: {str(e)}")
-        return pd.DataFrame()
+    return _process_files(gfs_files, 'GFS')
 
 def process_icon_data(icon_files):
     """
     Process ICON GRIB files and convert to pandas DataFrame.
+    
+    ICON publishes one file per variable, so files are grouped by forecast hour
+    instead of going through _process_files.
     """
+    spec = _MODEL_SPECS['ICON']
     try:
-        data = []
         # Group files by forecast hour
         files_by_hour = {}
         for file in icon_files:
-            match = re.search(r'_f(\d{3})_', file)
+            match = spec['forecast_hour'].search(file)
             if match:
                 forecast_hour = int(match.group(1))
                 if forecast_hour not in files_by_hour:
@@ -164,7 +340,9 @@ def process_icon_data(icon_files):
                 files_by_hour[forecast_hour].append(file)
         
         # Process each forecast hour
-        for forecast_hour, hour_files in files_by_hour.items():
+        def extract(item):
+            forecast_hour, hour_files = item
+            datasets = []
             try:
                 # Find files for each variable
                 u10_file = next((f for f in hour_files if '_u10.grib2' in f), None)
@@ -174,51 +352,41 @@ def process_icon_data(icon_files):
                 
                 if not all([u10_file, v10_file, t2m_file, prate_file]):
                     logger.warning(f"Missing files for forecast hour {forecast_hour}")
-                    continue
+                    return None
+                
+                var_files = [u10_file, v10_file, t2m_file, prate_file]
+                record = _cached_record(var_files)
+                if record is not None:
+                    return record
                 
-                # Open datasets
-                ds_wind_u = xr.open_dataset(u10_file, engine='cfgrib')
-                ds_wind_v = xr.open_dataset(v10_file, engine='cfgrib')
-                ds_temp = xr.open_dataset(t2m_file, engine='cfgrib')
-                ds_prate = xr.open_dataset(prate_file, engine='cfgrib')
+                # Open datasets, remembering each so it is closed even if a later one fails
+                for var_file in var_files:
+                    datasets.append(xr.open_dataset(var_file, engine='cfgrib'))
+                ds_wind_u, ds_wind_v, ds_temp, ds_prate = datasets
                 
                 # Extract valid time from any dataset (they should all have the same time)
-                valid_time = ds_wind_u['time'].values
-                if np.isscalar(valid_time):
-                    valid_time = np.array([valid_time])
-                valid_time = pd.to_datetime(valid_time)
+                valid_time = pd.DatetimeIndex(np.atleast_1d(ds_wind_u['time'].to_numpy()))
                 
                 # Extract variables
-                u10 = _extract_var(ds_wind_u, ['u10', 'U_10M'], valid_time)
-                v10 = _extract_var(ds_wind_v, ['v10', 'V_10M'], valid_time)
-                t2m = _extract_var(ds_temp, ['t2m', 'T_2M'], valid_time)
-                prate = _extract_var(ds_prate, ['prate', 'PRATE'], valid_time)
+                u10 = _extract_var([ds_wind_u], spec['u10'], len(valid_time))
+                v10 = _extract_var([ds_wind_v], spec['v10'], len(valid_time))
+                t2m = _extract_var([ds_temp], spec['t2m'], len(valid_time))
+                prate = _extract_var([ds_prate], spec['prate'], len(valid_time))
                 
-                # Calculate wind speed and direction
-                wind_speed = np.sqrt(u10**2 + v10**2)
-                wind_direction = (np.arctan2(u10, v10) * 180 / np.pi) % 360
-                
-                # Convert temperature from Kelvin to Celsius
-                temperature = t2m - 273.15
-                
-                # Convert precipitation to mm/hour
-                precipitation = prate * 3600
-                
-                for j, vt in enumerate(valid_time):
-                    data.append({
-                        'timestamp': vt,
-                        'forecast_hour': forecast_hour,
-                        'temperature': float(temperature[j]) if j < len(temperature) else np.nan,
-                        'wind_speed': float(wind_speed[j]) if j < len(wind_speed) else np.nan,
-                        'wind_direction': float(wind_direction[j]) if j < len(wind_direction) else np.nan,
-                        'precipitation': float(precipitation[j]) if j < len(precipitation) else np.nan,
-                        'model': 'ICON'
-                    })
+                record = (valid_time, forecast_hour, u10, v10, t2m, prate)
+                _store_record(var_files, record)
+                return record
             except Exception as e:
                 logger.warning(f"Error processing ICON data for forecast hour {forecast_hour}: {str(e)}")
-                continue
+                return None
+            finally:
+                # Everything needed is in memory now, so release the files right away
+                for ds in datasets:
+                    ds.close()
         
-        return pd.DataFrame(data)
+        records = _extract_records(extract, list(files_by_hour.items()))
+        _save_extract_cache()
+        return _model_frame(records, 'ICON')
     except Exception as e:
         logger.error(f"Error processing ICON data: {str(e)}")
         return pd.DataFrame()
@@ -227,106 +395,10 @@ def process_cmc_data(cmc_files):
     """
     Process CMC GRIB files and convert to pandas DataFrame.
     """
-    try:
-        data = []
-        for i, file in enumerate(cmc_files):
-            try:
-                ds_wind = xr.open_dataset(file, engine='cfgrib', filter_by_keys={'typeOfLevel': 'heightAboveGround', 'level': 10})
-                ds_temp = xr.open_dataset(file, engine='cfgrib', filter_by_keys={'typeOfLevel': 'heightAboveGround', 'level': 2})
-                ds_prate = xr.open_dataset(file, engine='cfgrib', filter_by_keys={'typeOfLevel': 'surface'})
-                if i == 0:
-                    _print_ds_debug(ds_wind, 'CMC wind')
-                    _print_ds_debug(ds_temp, 'CMC temp')
-                    _print_ds_debug(ds_prate, 'CMC prate')
-            except Exception as e:
-                logger.warning(f"Could not open CMC datasets for {file}: {e}")
-                continue
-            valid_time = ds_wind['time'].values
-            if np.isscalar(valid_time):
-                valid_time = np.array([valid_time])
-            valid_time = pd.to_datetime(valid_time)
-            
-            # Extract forecast hour from filename
-            match = re.search(r'f(\d{3})_', file)
-            if match:
-                forecast_hour = int(match.group(1))
-            else:
-                logger.warning(f"Could not extract forecast hour from filename: {file}")
-                continue
-            
-            u10 = _extract_var(ds_wind, ['u10', 'UGRD_TGL_10m'], valid_time)
-            v10 = _extract_var(ds_wind, ['v10', 'VGRD_TGL_10m'], valid_time)
-            t2m = _extract_var(ds_temp, ['t2m', 'TMP_TGL_2m'], valid_time)
-            prate = _extract_var(ds_prate, ['prate', 'APCP_SFC_0'], valid_time)
-            wind_speed = np.sqrt(u10**2 + v10**2)
-            wind_direction = (np.arctan2(u10, v10) * 180 / np.pi) % 360
-            temperature = t2m - 273.15
-            precipitation = prate * 3600
-            for j, vt in enumerate(valid_time):
-                data.append({
-                    'timestamp': vt,
-                    'forecast_hour': forecast_hour,
-                    'temperature': float(temperature[j]) if j < len(temperature) else np.nan,
-                    'wind_speed': float(wind_speed[j]) if j < len(wind_speed) else np.nan,
-                    'wind_direction': float(wind_direction[j]) if j < len(wind_direction) else np.nan,
-                    'precipitation': float(precipitation[j]) if j < len(precipitation) else np.nan,
-                    'model': 'CMC'
-                })
-        return pd.DataFrame(data)
-    except Exception as e:
-        logger.error(f"Error processing CMC data: {str(e)}")
-        return pd.DataFrame()
+    return _process_files(cmc_files, 'CMC')
 
 def process_nam_data(nam_files):
     """
     Process NAM GRIB files and convert to pandas DataFrame.
     """
-    try:
-        data = []
-        for i, file in enumerate(nam_files):
-            try:
-                ds_wind = xr.open_dataset(file, engine='cfgrib', filter_by_keys={'typeOfLevel': 'heightAboveGround', 'level': 10})
-                ds_temp = xr.open_dataset(file, engine='cfgrib', filter_by_keys={'typeOfLevel': 'heightAboveGround', 'level': 2})
-                ds_prate = xr.open_dataset(file, engine='cfgrib', filter_by_keys={'typeOfLevel': 'surface'})
-                if i == 0:
-                    _print_ds_debug(ds_wind, 'NAM wind')
-                    _print_ds_debug(ds_temp, 'NAM temp')
-                    _print_ds_debug(ds_prate, 'NAM prate')
-            except Exception as e:
-                logger.warning(f"Could not open NAM datasets for {file}: {e}")
-                continue
-            valid_time = ds_wind['time'].values
-            if np.isscalar(valid_time):
-                valid_time = np.array([valid_time])
-            valid_time = pd.to_datetime(valid_time)
-            
-            # Extract forecast hour from filename
-            match = re.search(r'f(\d{3})\.grib2$', file)
-            if match:
-                forecast_hour = int(match.group(1))
-            else:
-                logger.warning(f"Could not extract forecast hour from filename: {file}")
-                continue
-            
-            u10 = _extract_var(ds_wind, ['u10', 'UGRD', 'UGRD_10m'], valid_time)
-            v10 = _extract_var(ds_wind, ['v10', 'VGRD', 'VGRD_10m'], valid_time)
-            t2m = _extract_var(ds_temp, ['t2m', 'TMP', '2t', 'TMP_2m'], valid_time)
-            prate = _extract_var(ds_prate, ['prate', 'PRATE'], valid_time)
-            wind_speed = np.sqrt(u10**2 + v10**2)
-            wind_direction = (np.arctan2(u10, v10) * 180 / np.pi) % 360
-            temperature = t2m - 273.15
-            precipitation = prate * 3600
-            for j, vt in enumerate(valid_time):
-                data.append({
-                    'timestamp': vt,
-                    'forecast_hour': forecast_hour,
-                    'temperature': float(temperature[j]) if j < len(temperature) else np.nan,
-                    'wind_speed': float(wind_speed[j]) if j < len(wind_speed) else np.nan,
-                    'wind_direction': float(wind_direction[j]) if j < len(wind_direction) else np.nan,
-                    'precipitation': float(precipitation[j]) if j < len(precipitation) else np.nan,
-                    'model': 'NAM'
-                })
-        return pd.DataFrame(data)
-    except Exception as e:
-        logger.error(f"Error processing NAM data: {str(e)}")
-        return pd.DataFrame() 
\ No newline at end of file
+    return _process_files(nam_files, 'NAM')
@@ -5,6 +5,7 @@ from datetime import datetime, timedelta
 import pandas as pd
 import numpy as np
 import argparse
+import concurrent.futures
 from download_ensemble import download_hrrr_gribs, download_gfs_gribs, download_icon_gribs, download_cmc_gribs, download_nam_gribs
 from process_ensemble import process_hrrr_data, process_gfs_data, process_icon_data, process_cmc_data, process_nam_data
 from analyze_ensemble import analyze_ensemble_data
@@ -17,7 +18,12 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def run_ensemble_analysis(skip_download=False, hours=72, models=None):
+def _list_gribs(model):
+    """List a model's downloaded GRIB files in a single directory scan."""
+    with os.scandir(os.path.join("gribs", f"{model}_gribs")) as entries:
+        return [entry.path for entry in entries if entry.name.endswith(".grib2") and entry.is_file()]
+
+def run_ensemble_analysis(skip_download=False, hours=72, models=None, poll_seconds=0):
     """
     Main function to run the ensemble analysis workflow.
     
@@ -25,6 +31,7 @@ def run_ensemble_analysis(skip_download=False, hours=72, models=None):
         skip_download (bool): Whether to skip the download step
         hours (int): Number of forecast hours to download
         models (list): List of model names to download. If None, download all models.
+        poll_seconds (int): How long to keep polling for HRRR hours not yet published
     """
     try:
         # Get current time in UTC
@@ -51,53 +58,58 @@ def run_ensemble_analysis(skip_download=False, hours=72, models=None):
         
         # Download GRIB files if not skipped
         if not skip_download:
-            if models is None or 'gfs' in models:
-                logger.info("Downloading GFS data...")
-                download_gfs_gribs(lat_min, lat_max, lon_min, lon_max, variables, hours=gfs_hours)
-            
-            if models is None or 'icon' in models:
-                logger.info("Downloading ICON data...")
-                download_icon_gribs(lat_min, lat_max, lon_min, lon_max, variables, hours=icon_hours)
-            
-            if models is None or 'cmc' in models:
-                logger.info("Downloading CMC data...")
-                download_cmc_gribs(lat_min, lat_max, lon_min, lon_max, variables, hours=cmc_hours)
-            
-            if models is None or 'hrrr' in models:
-                logger.info("Downloading HRRR data...")
-                download_hrrr_gribs(lat_min, lat_max, lon_min, lon_max, variables, hours=hrrr_hours)
+            downloads = [
+                ("gfs", download_gfs_gribs, gfs_hours, {}),
+                ("icon", download_icon_gribs, icon_hours, {}),
+                ("cmc", download_cmc_gribs, cmc_hours, {}),
+                ("hrrr", download_hrrr_gribs, hrrr_hours, {'poll_seconds': poll_seconds}),
+                ("nam", download_nam_gribs, nam_hours, {})
+            ]
+            downloads = [d for d in downloads if models is None or d[0] in models]
             
-            if models is None or 'nam' in models:
-                logger.info("Downloading NAM data...")
-                download_nam_gribs(lat_min, lat_max, lon_min, lon_max, variables, hours=nam_hours)
+            # The models are independent, so overlap their run discovery and downloads
+            with concurrent.futures.ThreadPoolExecutor(max_workers=max(len(downloads), 1)) as executor:
+                futures = {}
+                for model, download, model_hours, kwargs in downloads:
+                    logger.info(f"Downloading {model.upper()} data...")
+                    future = executor.submit(download, lat_min, lat_max, lon_min, lon_max, variables, hours=model_hours, **kwargs)
+                    futures[future] = model
+                for future in concurrent.futures.as_completed(futures):
+                    future.result()
+                    logger.info(f"Finished downloading {futures[future].upper()} data")
         
         # Process downloaded data
         logger.info("Processing downloaded data...")
         data_frames = []
         if models is None or 'hrrr' in models:
-            hrrr_files = [os.path.join("gribs", "hrrr_gribs", f) for f in os.listdir("gribs/hrrr_gribs") if f.endswith(".grib2")]
+            hrrr_files = _list_gribs("hrrr")
             hrrr_data = process_hrrr_data(hrrr_files)
             data_frames.append(hrrr_data)
         if models is None or 'gfs' in models:
-            gfs_files = [os.path.join("gribs", "gfs_gribs", f) for f in os.listdir("gribs/gfs_gribs") if f.endswith(".grib2")]
+            gfs_files = _list_gribs("gfs")
             gfs_data = process_gfs_data(gfs_files)
             data_frames.append(gfs_data)
         if models is None or 'icon' in models:
-            icon_files = [os.path.join("gribs", "icon_gribs", f) for f in os.listdir("gribs/icon_gribs") if f.endswith(".grib2")]
+            icon_files = _list_gribs("icon")
             icon_data = process_icon_data(icon_files)
             data_frames.append(icon_data)
         if models is None or 'cmc' in models:
-            cmc_files = [os.path.join("gribs", "cmc_gribs", f) for f in os.listdir("gribs/cmc_gribs") if f.endswith(".grib2")]
+            cmc_files = _list_gribs("cmc")
             cmc_data = process_cmc_data(cmc_files)
             data_frames.append(cmc_data)
         if models is None or 'nam' in models:
-            nam_files = [os.path.join("gribs", "nam_gribs", f) for f in os.listdir("gribs/nam_gribs") if f.endswith(".grib2")]
+            nam_files = _list_gribs("nam")
             nam_data = process_nam_data(nam_files)
             data_frames.append(nam_data)
         
-        # Combine all data
+        # Combine all data; models that produced nothing have no columns to combine
+        data_frames = [df for df in data_frames if not df.empty]
         if data_frames:
             ensemble_data = pd.concat(data_frames, ignore_index=True)
+            # Store grouping keys as compact codes once, so every groupby in the
+            # analysis reuses them instead of re-hashing; values are already float32
+            ensemble_data['model'] = ensemble_data['model'].astype('category')
+            ensemble_data['forecast_hour'] = ensemble_data['forecast_hour'].astype('int32')
         else:
             ensemble_data = pd.DataFrame()
         
@@ -120,6 +132,7 @@ if __name__ == "__main__":
     parser.add_argument('--skip-download', action='store_true', help='Skip the download step and only process and visualize existing data')
     parser.add_argument('--hours', type=int, default=72, help='Number of hours of weather data to download (default: 72)')
     parser.add_argument('--grib', type=str, help='Comma-separated list of models to download (e.g., "gfs,icon,nam"). If not specified, all models will be downloaded.')
+    parser.add_argument('--poll-seconds', type=int, default=0, help='Keep polling this many seconds for HRRR forecast hours not published yet (default: 0, no polling)')
     args = parser.parse_args()
     
     # Parse the models argument
@@ -133,4 +146,4 @@ if __name__ == "__main__":
             logger.error(f"Valid models are: {', '.join(valid_models)}")
             sys.exit(1)
     
-    run_ensemble_analysis(skip_download=args.skip_download, hours=args.hours, models=models) 
\ No newline at end of file
+    run_ensemble_analysis(skip_download=args.skip_download, hours=args.hours, models=models, poll_seconds=args.poll_seconds) 
\ No newline at end of file
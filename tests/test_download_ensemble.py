@@ -0,0 +1,92 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import download_ensemble as de
+
+
+class _Response:
+    """Minimal stand-in for a streamed requests.Response."""
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+class ThrottleTest(unittest.TestCase):
+    def test_adapter_leaves_throttling_to_application(self):
+        retry = de._adapter.max_retries
+        self.assertFalse(retry.is_retry("GET", 429, True))
+        self.assertFalse(retry.is_retry("GET", 503, True))
+
+    def test_retry_after_is_capped(self):
+        url = "https://throttle.test/file.grib2"
+        with tempfile.TemporaryDirectory() as tmp, \
+                mock.patch.object(de.SESSION, "get", return_value=_Response(429, {"Retry-After": "3600"})), \
+                mock.patch.object(de.time, "sleep") as sleep:
+            self.assertFalse(de.download_with_retry(url, os.path.join(tmp, "out.grib2"), max_retries=2))
+        delay = sleep.call_args.args[0]
+        self.assertLessEqual(delay, de.MAX_RETRY_AFTER)
+        self.assertLessEqual(de._host_limiter(url).resume_at - de.time.monotonic(), de.MAX_RETRY_AFTER)
+
+
+class PollTest(unittest.TestCase):
+    def test_polls_until_published(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tasks = [("https://poll.test/f01.grib2", os.path.join(tmp, "f01.grib2"))]
+            calls = []
+
+            def publish_on_second_call(missing, desc, task):
+                calls.append(list(missing))
+                if len(calls) == 2:
+                    with open(missing[0][1], "wb") as f:
+                        f.write(de.GRIB_MAGIC + de.GRIB_END)
+
+            with mock.patch.object(de, "parallel_download", side_effect=publish_on_second_call), \
+                    mock.patch.object(de.time, "sleep"):
+                de.poll_missing_downloads(tasks, budget_seconds=3600)
+            self.assertEqual(calls, [tasks, tasks])
+            self.assertTrue(de._is_complete_grib(tasks[0][1]))
+
+    def test_unpublished_file_gets_one_quiet_request_per_poll(self):
+        url = "https://unpublished.test/f02.grib2"
+        clock = [0.0]
+
+        def advance(seconds):
+            clock[0] += seconds
+
+        # A 100 s budget fits a poll after 60 s and another after the remaining 40 s
+        with tempfile.TemporaryDirectory() as tmp, \
+                mock.patch.object(de.SESSION, "get", return_value=_Response(404)) as get, \
+                mock.patch.object(de.time, "sleep", side_effect=advance), \
+                mock.patch.object(de.time, "monotonic", side_effect=lambda: clock[0]), \
+                self.assertLogs(de.logger, level="DEBUG") as logs:
+            de.poll_missing_downloads([(url, os.path.join(tmp, "f02.grib2"))], budget_seconds=100)
+        self.assertEqual(get.call_count, 2)
+        # Files that are simply not out yet raise no per-file warnings or errors
+        self.assertEqual([record.getMessage() for record in logs.records if record.levelno >= de.logging.WARNING],
+                         ["Gave up waiting for 1 files that were not published in time"])
+
+    def test_download_hrrr_polls_when_requested(self):
+        run = de.datetime(2026, 1, 1, 12)
+        tasks = [("https://poll.test/f01.grib2", "f01.grib2")]
+        with tempfile.TemporaryDirectory() as tmp, \
+                mock.patch.object(de, "get_latest_hrrr_run", return_value=run), \
+                mock.patch.object(de, "prepare_hrrr_download_tasks", return_value=tasks), \
+                mock.patch.object(de, "parallel_download"), \
+                mock.patch.object(de, "poll_missing_downloads") as poll:
+            de.download_hrrr_gribs(44.5, 44.8, -63.6, -63.4, ["u10"], hours=2, out_dir=tmp, poll_seconds=600)
+        poll.assert_called_once_with(tasks, 600, desc="Polling HRRR data")
+
+
+if __name__ == "__main__":
+    unittest.main()
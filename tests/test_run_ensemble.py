@@ -0,0 +1,45 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    import run_ensemble
+except ImportError:  # cfgrib and matplotlib are needed to import the pipeline
+    run_ensemble = None
+
+
+@unittest.skipIf(run_ensemble is None, "run_ensemble dependencies not installed")
+class EmptyRunTest(unittest.TestCase):
+    def test_no_data_from_any_model(self):
+        processors = ["process_hrrr_data", "process_gfs_data", "process_icon_data",
+                      "process_cmc_data", "process_nam_data"]
+        with tempfile.TemporaryDirectory() as tmp:
+            cwd = os.getcwd()
+            os.chdir(tmp)
+            try:
+                for model in ("hrrr", "gfs", "icon", "cmc", "nam"):
+                    os.makedirs(os.path.join("gribs", f"{model}_gribs"))
+                patches = [mock.patch.object(run_ensemble, name, return_value=pd.DataFrame()) for name in processors]
+                for patch in patches:
+                    patch.start()
+                try:
+                    with mock.patch.object(run_ensemble, "analyze_ensemble_data", return_value={}) as analyze, \
+                            mock.patch.object(run_ensemble, "create_ensemble_visualization") as visualize:
+                        run_ensemble.run_ensemble_analysis(skip_download=True)
+                finally:
+                    for patch in patches:
+                        patch.stop()
+            finally:
+                os.chdir(cwd)
+        self.assertTrue(analyze.call_args.args[0].empty)
+        visualize.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,6 @@
+import matplotlib
+# Figures are only ever written to files, so render with the non-interactive Agg backend
+matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 import seaborn as sns
 import pandas as pd
@@ -93,26 +96,24 @@ def create_ensemble_visualization(analysis_results, output_dir):
                 model_agreement = analysis_results['model_agreement']
                 logger.info(f"Creating model agreement plots with data shape: {model_agreement.shape}")
                 
+                # Split by model once; every variable's line plot reuses the groups
+                model_list = list(model_agreement['model'].unique())
+                colors = sns.color_palette("husl", len(model_list))
+                color_dict = dict(zip(model_list, colors))  # Create color mapping dictionary
+                model_groups = dict(list(model_agreement.groupby('model', sort=False, observed=True)))
+                
                 for variable in ['temperature', 'wind_speed', 'wind_direction', 'precipitation']:
                     # Create a figure with two subplots
                     fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(15, 12), height_ratios=[2, 1])
                     
-                    # Get all data points for the variable
-                    all_data = []
-                    forecast_hours = []
-                    for model in model_agreement['model'].unique():
-                        model_data = model_agreement[model_agreement['model'] == model]
-                        all_data.extend(model_data[variable].values)
-                        forecast_hours.extend(model_data['forecast_hour'].values)
+                    # Split the variable by forecast hour once instead of filtering the
+                    # frame again for every hour
+                    by_hour = model_agreement.groupby('forecast_hour', sort=True)[variable]
+                    values_by_hour = [(hour, values.to_numpy()) for hour, values in by_hour]
                     
                     # Create a single violin plot for all data, grouped by individual forecast hours
-                    data_by_hour = []
-                    positions = []
-                    for hour in sorted(model_agreement['forecast_hour'].unique()):
-                        hour_data = model_agreement[model_agreement['forecast_hour'] == hour][variable].values
-                        if len(hour_data) > 1:  # Only include hours with multiple data points
-                            data_by_hour.append(hour_data)
-                            positions.append(hour)
+                    data_by_hour = [values for hour, values in values_by_hour if len(values) > 1]
+                    positions = [hour for hour, values in values_by_hour if len(values) > 1]
                     
                     if data_by_hour:  # Only create violin plot if we have data
                         parts = ax1.violinplot(
@@ -121,21 +122,23 @@ def create_ensemble_visualization(analysis_results, output_dir):
                             showmeans=True,
                             showextrema=True
                         )
-                        # Set color for the violin plot
+                        # Set color for the violin plot; the bodies are dense polygons, so
+                        # embed them in the PDF as an image rather than as vector paths
                         for pc in parts['bodies']:
                             pc.set_facecolor('lightblue')
                             pc.set_alpha(0.7)
+                            pc.set_rasterized(True)
                     
                     # Add mean line for all data points (by forecast hour)
-                    mean_by_hour = model_agreement.groupby('forecast_hour')[variable].mean()
+                    mean_by_hour = by_hour.mean()
                     ax1.plot(mean_by_hour.index, mean_by_hour.values, 
                             color='blue', linestyle='--', alpha=0.7, label='Ensemble Mean')
                     
-                    # Add individual data points for hours with only one value
-                    for hour in sorted(model_agreement['forecast_hour'].unique()):
-                        hour_data = model_agreement[model_agreement['forecast_hour'] == hour][variable].values
-                        if len(hour_data) == 1:  # Plot single points as scatter
-                            ax1.scatter(hour, hour_data[0], color='red', alpha=0.5, s=30)
+                    # Add individual data points for hours with only one value, in one call
+                    single_points = [(hour, values[0]) for hour, values in values_by_hour if len(values) == 1]
+                    if single_points:
+                        single_hours, single_values = zip(*single_points)
+                        ax1.scatter(single_hours, single_values, color='red', alpha=0.5, s=30)
                     
                     # Customize violin plot
                     ax1.set_title(f'{variable.title()} Ensemble Distribution')
@@ -145,23 +148,19 @@ def create_ensemble_visualization(analysis_results, output_dir):
                     ax1.legend()
                     
                     # Format x-axis to show every 6 hours with date
-                    x_dates = [current_time + timedelta(hours=int(h)) for h in sorted(model_agreement['forecast_hour'].unique())]
+                    x_dates = [current_time + timedelta(hours=int(hour)) for hour, values in values_by_hour]
                     ax1.set_xticks(positions)
                     ax1.set_xticklabels([d.strftime('%m/%d %H') for d in x_dates], rotation=45)
                     
-                    # Plot 2: Line plot for comparison (still by forecast_hour for each model)
-                    model_list = list(model_agreement['model'].unique())
-                    colors = sns.color_palette("husl", len(model_list))
-                    color_dict = dict(zip(model_list, colors))  # Create color mapping dictionary
-                    
                     # Create legend patches for the violin plot
                     legend_patches = []
                     for model, color in color_dict.items():
                         legend_patches.append(Patch(facecolor=color, alpha=0.7, label=model))
                     ax1.legend(handles=legend_patches, title='Models')
                     
-                    for i, model in enumerate(model_list):
-                        model_data = model_agreement[model_agreement['model'] == model]
+                    # Plot 2: Line plot for comparison (still by forecast_hour for each model)
+                    for model in model_list:
+                        model_data = model_groups[model]
                         x_dates = [current_time + timedelta(hours=h) for h in model_data['forecast_hour']]
                         ax2.plot(
                             x_dates,